@@ -88,8 +88,8 @@ async def get_puzzle_hint(request: PuzzleHintRequest):
     This does NOT use the RAG pipeline — it generates chess-knowledge hints
     based on the puzzle context, tailored for children aged 5-10.
     """
-    from groq import Groq
     from config import GROQ_MODEL
+    from services.groq_client import client
 
     if not GROQ_API_KEY:
         raise HTTPException(status_code=500, detail="Groq API not configured")
@@ -131,7 +131,6 @@ ENCOURAGEMENT: <a short motivational line, 1 sentence>
 """
 
     try:
-        client = Groq(api_key=GROQ_API_KEY)
         completion = await asyncio.to_thread(
             client.chat.completions.create,
             model=GROQ_MODEL,
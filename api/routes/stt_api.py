@@ -8,11 +8,43 @@ from pydantic import BaseModel
 import speech_recognition as sr
 import tempfile
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 import difflib
 
 router = APIRouter()
 
+# Shared pool for the parallel Hindi/English recognition requests
+_recognition_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stt")
+
+
+def recognize_hindi_or_english(recognizer: sr.Recognizer, audio_data: sr.AudioData) -> Tuple[str, str]:
+    """
+    Recognize speech as Hindi and English at the same time.
+    
+    Both Google requests are in flight together, so an English speaker no longer
+    waits for the Hindi attempt to fail first. Hindi still wins if both succeed.
+    
+    Returns:
+        (text, language_code)
+    
+    Raises:
+        sr.UnknownValueError: if neither language could be understood
+    """
+    futures = {
+        lang: _recognition_pool.submit(recognizer.recognize_google, audio_data, language=lang)
+        for lang in ("hi-IN", "en-IN")
+    }
+    for lang, future in futures.items():
+        try:
+            text = future.result()
+        except sr.UnknownValueError:
+            continue
+        for other in futures.values():
+            other.cancel()
+        return text, lang
+    raise sr.UnknownValueError()
+
 
 class STTResponse(BaseModel):
     """Response model for speech-to-text conversion"""
@@ -81,20 +113,14 @@ async def speech_to_text(
         detected_language = None
         
         if language == "auto":
-            # Try Hindi first, then English
+            # Hindi and English in parallel, Hindi preferred
             try:
-                result_text = recognizer.recognize_google(audio_data, language="hi-IN")
-                detected_language = "hi-IN"
+                result_text, detected_language = recognize_hindi_or_english(recognizer, audio_data)
             except sr.UnknownValueError:
-                # If Hindi fails, try English
-                try:
-                    result_text = recognizer.recognize_google(audio_data, language="en-IN")
-                    detected_language = "en-IN"
-                except sr.UnknownValueError:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Could not understand audio. Please ensure clear speech."
-                    )
+                raise HTTPException(
+                    status_code=400,
+                    detail="Could not understand audio. Please ensure clear speech."
+                )
         else:
             # Use specified language
             try:
@@ -273,29 +299,20 @@ async def speech_to_text_realtime(
         with sr.AudioFile(temp_file.name) as source:
             audio_data = recognizer.record(source)
         
-        # Try Hindi first for real-time (faster)
+        # Hindi and English in parallel, Hindi preferred
         try:
-            text = recognizer.recognize_google(audio_data, language="hi-IN")
+            text, detected_language = recognize_hindi_or_english(recognizer, audio_data)
             return {
                 "text": text,
-                "language": "hi-IN",
+                "language": detected_language,
                 "is_final": True
             }
         except sr.UnknownValueError:
-            # Try English
-            try:
-                text = recognizer.recognize_google(audio_data, language="en-IN")
-                return {
-                    "text": text,
-                    "language": "en-IN",
-                    "is_final": True
-                }
-            except sr.UnknownValueError:
-                return {
-                    "text": "",
-                    "language": "unknown",
-                    "is_final": False
-                }
+            return {
+                "text": "",
+                "language": "unknown",
+                "is_final": False
+            }
     
     except Exception as e:
         raise HTTPException(
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-import os
-import tempfile
 import asyncio
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import edge_tts
-from fastapi import APIRouter, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+from config import CACHE_TTL
+from services.cache_service import TTLCache
+
 router = APIRouter()
 
 
@@ -17,79 +20,168 @@ router = APIRouter()
 HINDI_VOICE = "hi-IN-MadhurNeural"
 ENGLISH_VOICE = "en-IN-NeerjaNeural"
 
+# Request pool: up to TTS_BATCH_SIZE queued requests are dispatched together,
+# identical (text, voice) pairs are synthesized once, and at most
+# TTS_MAX_IN_FLIGHT edge-tts streams run at a time across all users.
+TTS_BATCH_SIZE = 8
+TTS_MAX_IN_FLIGHT = 32
+
+_tts_queue: Optional[asyncio.Queue] = None
+_tts_worker_task: Optional[asyncio.Task] = None
+_tts_slots: Optional[asyncio.Semaphore] = None
+# The loop only holds weak references to tasks, so in-flight batches live here
+_tts_batch_tasks: Set[asyncio.Task] = set()
+
+# Raw request (voice, text) -> (mp3 bytes, resolved voice).
+# A hit skips normalization, voice detection and synthesis entirely.
+_audio_cache = TTLCache(max_size=128, default_ttl=CACHE_TTL)
+
 
 class TTSRequest(BaseModel):
     text: str
     voice: Optional[str] = None
 
 
+_TTS_REPLACEMENTS = {
+    "kise": "kisse",
+    "kon": "kaun",
+    "kehte": "kehtey",
+    "kyun": "kyon",
+    "raja": "raajaa",
+    "bulate": "bulaate",
+}
+_TTS_REPLACEMENTS_RE = re.compile("|".join(map(re.escape, _TTS_REPLACEMENTS)))
+
+
 def normalize_for_tts(text: str) -> str:
-    replacements = {
-        "kise": "kisse",
-        "kon": "kaun",
-        "kehte": "kehtey",
-        "kyun": "kyon",
-        "raja": "raajaa",
-        "bulate": "bulaate",
-    }
-    out = text
-    for k, v in replacements.items():
-        out = out.replace(k, v)
-    return out
+    # Single pass over the text instead of one str.replace per entry
+    return _TTS_REPLACEMENTS_RE.sub(lambda m: _TTS_REPLACEMENTS[m.group(0)], text)
+
+
+# One case-insensitive pass instead of lower() + a substring scan per keyword
+_ENGLISH_KEYWORDS_RE = re.compile(
+    r"king|queen|pawn|rook|bishop|knight|game|move|step|board|check",
+    re.IGNORECASE,
+)
 
 
 def is_mostly_english(text: str) -> bool:
-    keywords = [
-        "king",
-        "queen",
-        "pawn",
-        "rook",
-        "bishop",
-        "knight",
-        "game",
-        "move",
-        "step",
-        "board",
-        "check",
-    ]
-    t = text.lower()
-    return any(k in t for k in keywords)
-
-
-async def _tts_save(text: str, voice: str, path: str):
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(path)
+    return _ENGLISH_KEYWORDS_RE.search(text) is not None
 
 
-@router.post("/tts")
-async def tts_endpoint(req: TTSRequest, background: BackgroundTasks):
-    """Generate TTS MP3 for `req.text` and return it as a FileResponse.
+@lru_cache(maxsize=256)
+def _prepare_tts(text: str, voice: Optional[str] = None) -> tuple:
+    """Normalize text and pick a voice (explicit voice wins). Memoized per raw text."""
+    text = normalize_for_tts(text.strip())
+    return text, voice or (ENGLISH_VOICE if is_mostly_english(text) else HINDI_VOICE)
 
-    The temporary file is removed after the response is sent.
-    """
+
+async def _tts_chunks(text: str, voice: str) -> AsyncIterator[bytes]:
+    """Yield MP3 frames as edge-tts produces them."""
+    async for chunk in edge_tts.Communicate(text, voice).stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+
+
+async def _tts_bytes(text: str, voice: str) -> bytes:
+    """Synthesize `text` into MP3 bytes in memory (runs on the server's event loop)."""
+    buf = bytearray()
+    async for data in _tts_chunks(text, voice):
+        buf.extend(data)
+    return bytes(buf)
+
+
+async def _run_tts_batch(batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+    """Synthesize one batch, sharing work between identical requests."""
+    waiters: Dict[Tuple[str, str], List[asyncio.Future]] = {}
+    for text, voice, future in batch:
+        waiters.setdefault((text, voice), []).append(future)
+
+    async def _one(text: str, voice: str) -> bytes:
+        async with _tts_slots:
+            return await _tts_bytes(text, voice)
+
+    keys = list(waiters)
+    results = await asyncio.gather(*(_one(t, v) for t, v in keys), return_exceptions=True)
+    for key, result in zip(keys, results):
+        for future in waiters[key]:
+            if future.done():
+                continue  # caller went away
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _batch_done(task: asyncio.Task) -> None:
+    """Forget a finished batch and surface any error it raised."""
+    _tts_batch_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ TTS batch failed: {task.exception()}")
+
+
+async def _tts_worker(queue: asyncio.Queue) -> None:
+    """Drain the queue in batches; each batch runs without blocking the next."""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < TTS_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        task = asyncio.create_task(_run_tts_batch(batch))
+        _tts_batch_tasks.add(task)
+        task.add_done_callback(_batch_done)
+
+
+async def synthesize(text: str, voice: str) -> bytes:
+    """Synthesize MP3 bytes through the shared request pool."""
+    global _tts_queue, _tts_worker_task, _tts_slots
+    loop = asyncio.get_running_loop()
+    if _tts_worker_task is None or _tts_worker_task.done() or _tts_worker_task.get_loop() is not loop:
+        _tts_queue = asyncio.Queue()
+        _tts_slots = asyncio.Semaphore(TTS_MAX_IN_FLIGHT)
+        _tts_worker_task = loop.create_task(_tts_worker(_tts_queue))
+
+    future = loop.create_future()
+    await _tts_queue.put((text, voice, future))
+    return await future
+
+
+@router.post("/tts")
+async def tts_endpoint(req: TTSRequest):
+    """Generate TTS MP3 for `req.text` and return it as the response body."""
     if not req.text or not req.text.strip():
         raise HTTPException(status_code=400, detail="text is required")
 
-    text = normalize_for_tts(req.text.strip())
+    cache_key = f"{req.voice or ''}:{req.text}"
+    cached = _audio_cache.get(cache_key)
+    if cached is not None:
+        audio, voice = cached
+    else:
+        text, voice = _prepare_tts(req.text, req.voice)
+
+        try:
+            audio = await synthesize(text, voice)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"TTS generation failed: {e}")
 
-    # Choose voice if not provided
-    voice = req.voice if req.voice else (ENGLISH_VOICE if is_mostly_english(text) else HINDI_VOICE)
+        _audio_cache.set(cache_key, (audio, voice))
 
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    tmp.close()
+    return Response(
+        content=audio,
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": 'attachment; filename="speech.mp3"'},
+    )
 
-    try:
-        # Run edge-tts save asynchronously
-        await _tts_save(text, voice, tmp.name)
-    except Exception as e:
-        # Clean up temp file on error
-        try:
-            os.remove(tmp.name)
-        except Exception:
-            pass
-        raise HTTPException(status_code=500, detail=f"TTS generation failed: {e}")
 
-    # Schedule file removal after response
-    background.add_task(os.remove, tmp.name)
+@router.get("/tts")
+async def tts_stream_endpoint(text: str, voice: Optional[str] = None):
+    """Stream TTS MP3 frames for `text` as they are synthesized.
+
+    Meant for `<audio src="/api/tts?text=...">`: the browser starts playback
+    on the first frame instead of waiting for the whole utterance.
+    """
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail="text is required")
+
+    text, voice = _prepare_tts(text, voice)
 
-    return FileResponse(tmp.name, media_type="audio/mpeg", filename="speech.mp3")
+    return StreamingResponse(_tts_chunks(text, voice), media_type="audio/mpeg")
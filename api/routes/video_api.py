@@ -1,22 +1,68 @@
 # api/routes/video_api.py - Enhanced Video API with Bilingual Support
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, List, Literal
+from typing import Optional, Dict, List, Literal, Iterator, Mapping
+from collections.abc import MutableMapping
+from types import MappingProxyType
 import uuid
 import asyncio
+import json
 
 # Import services
 from services.video_processor import process_video, cleanup_temp_files
 from services.video_explainer import explain_video_concept, get_video_concepts
-from rag.video_generator import generate_video_response
+from rag.video_generator import generate_video_response, stream_video_response
 from services.cache_service import get_cache_stats
 from config import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
 
-router = APIRouter()
+# orjson serializes the transcript/explanation payloads much faster than stdlib json
+router = APIRouter(default_response_class=ORJSONResponse)
+
+class VideoStore(MutableMapping):
+    """
+    video_id -> video data mapping that also keeps the /video/list entry for
+    each video, built once on insert instead of on every listing.
+    
+    Every write (update, setdefault, pop, ...) goes through __setitem__ /
+    __delitem__, and stored entries are read-only views, so a listing
+    entry can't go stale; replace an entry to change it.
+    """
+    
+    def __init__(self):
+        self._videos: Dict[str, Mapping] = {}
+        self._summaries: Dict[str, dict] = {}
+    
+    def __getitem__(self, video_id: str) -> Mapping:
+        return self._videos[video_id]
+    
+    def __setitem__(self, video_id: str, data: dict) -> None:
+        self._videos[video_id] = MappingProxyType(dict(data))
+        self._summaries[video_id] = {
+            "video_id": video_id,
+            "title": data.get("title", "Unknown"),
+            "detected_language": data.get("detected_language"),
+            "cached": data.get("cached", False)
+        }
+    
+    def __delitem__(self, video_id: str) -> None:
+        del self._videos[video_id]
+        del self._summaries[video_id]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._videos)
+    
+    def __len__(self) -> int:
+        return len(self._videos)
+    
+    def summaries(self) -> List[dict]:
+        """Listing entries for every stored video."""
+        return list(self._summaries.values())
+
 
 # In-memory storage for transcripts (Use Redis/DB in production!)
 # Format: { video_id: {"transcript": str, "title": str, "metadata": dict} }
-VIDEO_STORE: Dict[str, dict] = {}
+VIDEO_STORE = VideoStore()
 
 
 # ================================
@@ -135,7 +181,9 @@ async def chat_video_endpoint(request: VideoChatRequest):
         )
     
     transcript = video_data["transcript"]
-    response = generate_video_response(
+    # LLM calls block, so run them off the event loop
+    response = await asyncio.to_thread(
+        generate_video_response,
         transcript, 
         request.question,
         language=request.language
@@ -148,6 +196,32 @@ async def chat_video_endpoint(request: VideoChatRequest):
     )
 
 
+@router.post("/video/chat/stream")
+async def chat_video_stream_endpoint(request: VideoChatRequest):
+    """
+    Streaming version of /video/chat (NDJSON, one JSON event per line).
+    
+    Emits `{"type": "delta", "text": ...}` as tokens arrive, then a final
+    `{"type": "final", "answer": ..., "explanation": ..., "language": ...}`.
+    """
+    video_data = VIDEO_STORE.get(request.video_id)
+    
+    if not video_data:
+        raise HTTPException(
+            status_code=404, 
+            detail="Video ID not found. Process the video first."
+        )
+    
+    events = stream_video_response(
+        video_data["transcript"],
+        request.question,
+        language=request.language
+    )
+    lines = (json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @router.post("/video/explain", response_model=VideoExplainResponse)
 async def explain_video_endpoint(request: VideoExplainRequest):
     """
@@ -168,7 +242,8 @@ async def explain_video_endpoint(request: VideoExplainRequest):
     
     transcript = video_data["transcript"]
     
-    result = explain_video_concept(
+    result = await asyncio.to_thread(
+        explain_video_concept,
         transcript=transcript,
         topic=request.topic,
         mode=request.mode,
@@ -200,7 +275,8 @@ async def explain_what_endpoint(
     if not video_data:
         raise HTTPException(status_code=404, detail="Video ID not found.")
     
-    result = explain_video_concept(
+    result = await asyncio.to_thread(
+        explain_video_concept,
         transcript=video_data["transcript"],
         topic=query,
         mode="what",
@@ -225,7 +301,8 @@ async def explain_why_endpoint(
     if not video_data:
         raise HTTPException(status_code=404, detail="Video ID not found.")
     
-    result = explain_video_concept(
+    result = await asyncio.to_thread(
+        explain_video_concept,
         transcript=video_data["transcript"],
         topic=query,
         mode="why",
@@ -249,7 +326,8 @@ async def get_concepts_endpoint(
     if not video_data:
         raise HTTPException(status_code=404, detail="Video ID not found.")
     
-    concepts = get_video_concepts(
+    concepts = await asyncio.to_thread(
+        get_video_concepts,
         transcript=video_data["transcript"],
         language=language
     )
@@ -264,14 +342,7 @@ async def get_concepts_endpoint(
 @router.get("/video/list")
 async def list_videos():
     """List all processed videos in memory."""
-    videos = []
-    for vid, data in VIDEO_STORE.items():
-        videos.append({
-            "video_id": vid,
-            "title": data.get("title", "Unknown"),
-            "detected_language": data.get("detected_language"),
-            "cached": data.get("cached", False)
-        })
+    videos = VIDEO_STORE.summaries()
     
     return {
         "count": len(VIDEO_STORE),
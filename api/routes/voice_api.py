@@ -4,16 +4,18 @@ Handles the complete voice workflow: STT → Chat → TTS
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
 import speech_recognition as sr
 import tempfile
 import os
 import asyncio
 from typing import Optional
-import edge_tts
-
+from urllib.parse import quote
 from rag.utils import generate_response
+from api.routes.stt_api import recognize_hindi_or_english
+from api.routes.tts_api import synthesize, is_mostly_english
+from api.routes.tts_api import normalize_for_tts as _normalize_tts_text
 
 router = APIRouter()
 
@@ -32,35 +34,8 @@ class VoiceQueryResponse(BaseModel):
 
 
 def normalize_for_tts(text: str) -> str:
-    """Normalize text for better TTS pronunciation"""
-    replacements = {
-        "kise": "kisse",
-        "kon": "kaun",
-        "kehte": "kehtey",
-        "kyun": "kyon",
-        "raja": "raajaa",
-        "bulate": "bulaate",
-    }
-    out = text.lower()
-    for k, v in replacements.items():
-        out = out.replace(k, v)
-    return out
-
-
-def is_mostly_english(text: str) -> bool:
-    """Detect if text is primarily English"""
-    keywords = [
-        "king", "queen", "pawn", "rook", "bishop", "knight",
-        "game", "move", "step", "board", "check"
-    ]
-    text_lower = text.lower()
-    return any(k in text_lower for k in keywords)
-
-
-async def _tts_save(text: str, voice: str, path: str):
-    """Generate TTS audio and save to file"""
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(path)
+    """Normalize text for better TTS pronunciation (lowercased first, unlike /tts)"""
+    return _normalize_tts_text(text.lower())
 
 
 @router.post("/voice-query")
@@ -111,22 +86,17 @@ async def voice_query(
             recognizer.adjust_for_ambient_noise(source, duration=0.5)
             audio_data = recognizer.record(source)
         
-        # Try Hindi first, then English
+        # Hindi and English in parallel, Hindi preferred
         transcribed_text = None
         detected_language = None
         
         try:
-            transcribed_text = recognizer.recognize_google(audio_data, language="hi-IN")
-            detected_language = "hi-IN"
+            transcribed_text, detected_language = recognize_hindi_or_english(recognizer, audio_data)
         except sr.UnknownValueError:
-            try:
-                transcribed_text = recognizer.recognize_google(audio_data, language="en-IN")
-                detected_language = "en-IN"
-            except sr.UnknownValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Could not understand audio. Please speak clearly."
-                )
+            raise HTTPException(
+                status_code=400,
+                detail="Could not understand audio. Please speak clearly."
+            )
         
         if not transcribed_text:
             raise HTTPException(
@@ -172,9 +142,8 @@ async def voice_query(
     # Step 3: Text-to-Speech (optional)
     audio_url = None
     if return_audio:
-        # For now, we'll indicate where the TTS endpoint is
-        # In production, you might generate and store the file, then return a URL
-        audio_url = f"/api/tts?text={answer}"
+        # GET /api/tts streams the MP3 as it is synthesized
+        audio_url = f"/api/tts?text={quote(answer)}"
     
     return VoiceQueryResponse(
         transcribed_text=transcribed_text,
@@ -233,12 +202,9 @@ async def voice_query_audio_response(
             audio_data = recognizer.record(source)
         
         try:
-            transcribed_text = recognizer.recognize_google(audio_data, language="hi-IN")
+            transcribed_text, _ = recognize_hindi_or_english(recognizer, audio_data)
         except sr.UnknownValueError:
-            try:
-                transcribed_text = recognizer.recognize_google(audio_data, language="en-IN")
-            except sr.UnknownValueError:
-                raise HTTPException(status_code=400, detail="Could not understand audio")
+            raise HTTPException(status_code=400, detail="Could not understand audio")
     
     finally:
         try:
@@ -263,30 +229,16 @@ async def voice_query_audio_response(
     text_to_speak = normalize_for_tts(text_to_speak)
     voice = ENGLISH_VOICE if is_mostly_english(text_to_speak) else HINDI_VOICE
     
-    temp_mp3 = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    temp_mp3.close()
-    
     try:
-        await _tts_save(text_to_speak, voice, temp_mp3.name)
-        
-        def iterfile():
-            with open(temp_mp3.name, "rb") as f:
-                yield from f
-            # Clean up after streaming
-            os.unlink(temp_mp3.name)
-        
-        return StreamingResponse(
-            iterfile(),
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"attachment; filename=answer.mp3",
-                "X-Transcribed-Text": transcribed_text
-            }
-        )
-    
+        audio_bytes = await synthesize(text_to_speak, voice)
     except Exception as e:
-        try:
-            os.unlink(temp_mp3.name)
-        except:
-            pass
         raise HTTPException(status_code=500, detail=f"Error generating audio: {str(e)}")
+    
+    return Response(
+        content=audio_bytes,
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": f"attachment; filename=answer.mp3",
+            "X-Transcribed-Text": transcribed_text
+        }
+    )
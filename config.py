@@ -33,6 +33,7 @@ GROQ_TIMEOUT = 30  # seconds
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")  # Options: tiny, base, small
 WHISPER_DEVICE = "cpu"
 WHISPER_COMPUTE_TYPE = "int8"
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "true").lower() == "true"  # Load at startup, not on first request
 
 # ================================
 # Video Processing
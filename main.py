@@ -14,8 +14,9 @@ from api.routes import video_api as video
 # Import middleware and config
 from api.middleware import setup_exception_handlers
 from api.middleware.error_handler import log_requests
-from config import CORS_ORIGINS, GROQ_API_KEY, ENV
+from config import CORS_ORIGINS, GROQ_API_KEY, ENV, WHISPER_PRELOAD
 from services.cache_service import get_cache_stats
+from services.video_processor import warm_whisper_model
 
 
 # ================================
@@ -30,7 +31,10 @@ async def lifespan(app: FastAPI):
     print(f"   Groq API: {'✅ Configured' if GROQ_API_KEY else '❌ Not configured'}")
     
     # Pre-warm services (optional)
-    # You can import and initialize heavy services here
+    # Whisper loads in the background so the first transcription doesn't pay for it
+    if WHISPER_PRELOAD:
+        warm_whisper_model()
+        print("   Whisper: 🔄 Warming up in background")
     
     yield  # Application runs
     
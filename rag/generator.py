@@ -1,569 +1,12 @@
-# # rag/generator.py
-# import os
-# import google.generativeai as genai
-# from rag.retriever import get_relevant_stories
-# from dotenv import load_dotenv
-# load_dotenv()  # ✅ This loads environment variables from .env
-
-# # Configure Gemini API
-# genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-# def generate_llm_response(user_query: str, explain=False):
-#     """
-#     Generate kid-friendly response using Gemini API + retrieved context.
-    
-#     Args:
-#         user_query: The child's question
-#         explain: If True, returns full explanation. If False, returns one-word answer.
-    
-#     Returns:
-#         dict with 'answer' and 'explanation' keys
-#     """
-    
-#     # 1️⃣ Retrieve top 3 relevant story chunks
-#     relevant_chunks = get_relevant_stories(user_query)
-    
-#     # 🛑 If no relevant context found, return honest "don't know" response
-#     if not relevant_chunks or relevant_chunks.strip() == "":
-#         return {
-#             "answer": "not available",
-#             "explanation": "you will learn about it in future chapters!"
-#         }
-    
-#     context = "\n\n".join(relevant_chunks) if isinstance(relevant_chunks, list) else relevant_chunks
-
-#     # 2️⃣ Construct prompt with STRICT context-only instructions
-#     if explain:
-#         # Full explanation mode with detailed story narrative
-#         # Make the explanation slightly longer and strictly grounded in story context.
-#         # Ask for 3-6 sentences, start with Hinglish cue 'Yaad hai jab...', and quote exact dialogue when present.
-#         prompt = f"""
-# You are Chess Buddy, retelling a real moment from a story to a child.
-
-# STRICT RULES (NO EXCEPTIONS):
-# 1. You MUST quote exact sentences from the Story Context using quotation marks
-# 2. You MUST mention who said the line (Chessy, Minku, King, etc.)
-# 3. You MUST explain the answer ONLY using quoted story lines
-# 4. You MUST NOT invent new dialogue or events
-# 5. Speak in warm Hinglish like a real person explaining a story
-
-# Story Context:
-# {context}
-
-# Child's Question:
-# {user_query}
-
-# Now explain by quoting the exact lines from the story that give the answer.
-# Start with: "Yaad hai jab..."
-# """
-
-#     else:
-#         # One-word answer mode (can be in Hinglish)
-#         prompt = f"""
-# You are Chess Buddy, a friendly chess teacher for kids aged 5-10 years.
-
-# CRITICAL INSTRUCTION: Answer with ONLY ONE WORD or a very short phrase (max 2-3 words). Can be in Hinglish.
-
-# Story Context:
-# {context}
-
-# Child's Question: {user_query}
-
-# Instructions:
-# - Read the Story Context carefully
-# - Extract the main answer (like: "King", "Ek step", "Knight", "Pawn", "Aage", "Diagonal", etc.)
-# - Answer with JUST that one word or short phrase (Hinglish is fine)
-# - DO NOT add explanations or extra words
-# - If you cannot find the answer in the context, say only: "Unknown"
-
-# ONE-WORD ANSWER:
-# """
-
-#     # 3️⃣ Generate response via Gemini API
-#     try:
-#         # Initialize Gemini model with system instruction
-#         model = genai.GenerativeModel(
-#             model_name='gemini-2.5-flash',
-#             generation_config={
-#                 'temperature': 0.2 if not explain else 0.4,  # Lower temp for better story adherence
-#                 'max_output_tokens': 100 if not explain else 600,  # More tokens for detailed story narratives
-#                 'top_p': 0.95,
-#                 'top_k': 40
-#             },
-#             system_instruction="You are a storyteller retelling the Chessland adventures to a child! Give DETAILED, RICH explanations by retelling what happened in the story scenes. Always mention character names (Chintu, Minku, Board, King, Queen, etc.), quote their actual dialogue, and include story analogies like 'chocolate is our King'. Paint vivid story scenes with dialogue and reactions. Respond ONLY using the story context provided - don't add anything not in the story. Use conversational Hinglish with emojis naturally."
-#         )
-        
-#         # Generate response
-#         response = model.generate_content(prompt)
-        
-#         # Check if response is valid
-#         if not response.candidates or not response.candidates[0].content.parts:
-#             return {
-#                 "answer": "not available",
-#                 "explanation": "you will learn about it in future chapters!"
-#             }
-        
-#         response_text = response.text.strip()
-
-#         # If in one-word mode, verify evidence in retrieved context before returning
-#         if not explain:
-#             one_word_answer = response_text
-
-#             # Build list of chunks from the retrieved context so we can check for evidence.
-#             if isinstance(relevant_chunks, list):
-#                 chunks_list = relevant_chunks
-#             else:
-#                 # retriever joins chunks with a separator; split back into chunks
-#                 chunks_list = [c.strip() for c in relevant_chunks.split("\n\n---\n\n") if c.strip()]
-
-#             # Simple evidence check: ensure the one-word answer appears (word-boundary) in at least one chunk
-#             import re
-#             answer_token = one_word_answer.strip().lower()
-#             evidence_found = False
-#             if answer_token:
-#                 for chunk in chunks_list:
-#                     if re.search(r"\b" + re.escape(answer_token) + r"\b", chunk.lower()):
-#                         evidence_found = True
-#                         break
-
-#             # If no direct evidence, don't return a possibly hallucinated answer
-#             if not evidence_found:
-#                 return {
-#                     "answer": "Unknown",
-#                     "explanation": "I don't have that information in the chess stories I know. Can you ask me about something from the chess tales? 📚♟️"
-#                 }
-
-#             # Evidence exists — generate explanation (kept strict)
-#             explanation = generate_llm_response(user_query, explain=True)
-
-#             return {
-#                 "answer": one_word_answer,
-#                 "explanation": explanation["explanation"] if isinstance(explanation, dict) else explanation
-#             }
-
-#         else:
-#             # In explanation mode, ensure the explanation is faithful by returning as-is (it's generated from same context)
-#             return {
-#                 "answer": response_text,
-#                 "explanation": response_text
-#             }
-
-#     except Exception as e:
-#         print("Error:", e)
-#         return {
-#             "answer": "Error",
-#             "explanation": "Oops! Chess Buddy is thinking too hard right now. Try again!"
-#         }
 # rag/generator.py
-# import os
-# import re
-# import google.generativeai as genai
-# from dotenv import load_dotenv
-# from rag.retriever import get_relevant_stories
-
-# load_dotenv()  # Load environment variables
-
-
-# # -------------------------------
-# # Gemini Configuration
-# # -------------------------------
-# GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-# if not GOOGLE_API_KEY:
-#     raise RuntimeError("❌ GOOGLE_API_KEY not found in environment or .env file")
-
-# genai.configure(api_key=GOOGLE_API_KEY)
-
-# GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-
-
-# # -------------------------------
-# # Main Generator Function
-# # -------------------------------
-# def generate_llm_response(user_query: str, explain: bool = False):
-#     """
-#     Generate kid-friendly response using Gemini API + retrieved story context.
-
-#     Args:
-#         user_query (str): Child's question
-#         explain (bool): False → short answer, True → story-based explanation
-
-#     Returns:
-#         dict: { "answer": str, "explanation": str }
-#     """
-
-#     # -------------------------------
-#     # Normalize common kid-style queries
-#     # -------------------------------
-#     normalized_query = user_query.lower()
-#     # normalized_query = normalized_query.replace("k ", "king ")
-#     # normalized_query = normalized_query.replace("k ka", "king ka")
-#     # normalized_query = normalized_query.replace("k kise", "king kise")
-
-#     # -------------------------------
-#     # 1️⃣ Retrieve relevant story chunks
-#     # -------------------------------
-#     relevant_chunks = get_relevant_stories(normalized_query)
-
-#     # If nothing relevant found
-#     if not relevant_chunks or len(relevant_chunks) == 0:
-#         return {
-#             "answer": "not available",
-#             "explanation": "Iska jawab abhi story mein nahi aaya hai 😊"
-#         }
-
-#     # Combine chunks into a single context string
-#     context = "\n\n---\n\n".join(relevant_chunks)
-
-#     # -------------------------------
-#     # 2️⃣ Build Prompt
-#     # -------------------------------
-#     if explain:
-#         # Explanation mode (story retelling with quotes)
-#         prompt = f"""
-# You are Chess Buddy, explaining a real moment from a children's chess story.
-
-# STRICT RULES (NO EXCEPTIONS):
-# 1. You MUST quote exact sentences from the Story Context using quotation marks
-# 2. You MUST mention who said the line (Chessy, Chintu, Minku, King, etc.)
-# 3. You MUST explain the answer ONLY using quoted story lines
-# 4. You MUST NOT invent new dialogue, events, or facts
-# 5. Speak in warm Hinglish like a real person explaining a story
-# 6. Start your explanation with: "Yaad hai jab..."
-
-
-# Story Context:
-# {context}
-
-# Child's Question:
-# {user_query}
-
-# Now explain by quoting the exact lines from the story that give us the answer.
-# """
-#     else:
-#         # One-word / short-phrase answer mode
-#         prompt = f"""
-# You are Chess Buddy, a friendly chess teacher for kids aged 5-10 years.
-# Keep basic chess terminologies in mind while answering.
-# CRITICAL INSTRUCTION:
-# Answer with ONLY ONE WORD or a very short phrase (maximum 2–3 words).
-
-# Story Context:
-# {context}
-
-# Child's Question:
-# {user_query}
-
-# Instructions:
-# - Read the Story Context carefully
-# - Extract the direct answer from the story
-# - Answer using ONLY that word or short phrase
-# - Hinglish is allowed
-# - DO NOT add explanations or extra words
-# - If the answer is not clearly present, say ONLY: "Unknown"
-
-# ONE-WORD ANSWER:
-# """
-
-#     # -------------------------------
-#     # 3️⃣ Call Gemini API
-#     # -------------------------------
-#     try:
-#         model = genai.GenerativeModel(
-#             model_name=GEMINI_MODEL_NAME,
-#             generation_config={
-#                 "temperature": 0.3 if not explain else 0.4,
-#                 "max_output_tokens": 60 if not explain else 500,
-#                 "top_p": 0.95,
-#                 "top_k": 40,
-#             },
-#             system_instruction=(
-#                 "You are a strict story-based assistant for kids. "
-#                 "You MUST answer only from the provided story context. "
-#                 "Use Hinglish naturally. Never add facts outside the story."
-#             ),
-#         )
-
-#         response = model.generate_content(prompt)
-
-#         # Safety check
-#         if not response or not hasattr(response, "text"):
-#             return {
-#                 "answer": "Unknown",
-#                 "explanation": "Story se clear jawab nahi mila 😊"
-#             }
-
-#         response_text = response.text.strip()
-
-#         # -------------------------------
-#         # 4️⃣ One-word evidence check
-#         # -------------------------------
-#         if not explain:
-#             one_word_answer = response_text.splitlines()[0].strip()
-
-#             # Check evidence: the answer must appear in at least one chunk
-#             answer_token = one_word_answer.lower()
-#             evidence_found = False
-
-#             for chunk in relevant_chunks:
-#                 if re.search(r"\b" + re.escape(answer_token) + r"\b", chunk.lower()):
-#                     evidence_found = True
-#                     break
-
-#             if not evidence_found:
-#                 return {
-#                     "answer": "Unknown",
-#                     "explanation": "Iska clear mention story mein nahi mila 📘"
-#                 }
-
-#             # Generate explanation using explain=True
-#             explanation = generate_llm_response(user_query, explain=True)
-
-#             return {
-#                 "answer": one_word_answer,
-#                 "explanation": explanation["explanation"]
-#             }
-
-#         # -------------------------------
-#         # 5️⃣ Explanation mode return
-#         # -------------------------------
-#         return {
-#             "answer": response_text,
-#             "explanation": response_text
-#         }
-
-#     except Exception as e:
-#         print("❌ Gemini Error:", e)
-#         return {
-#             "answer": "Error",
-#             "explanation": "Chess Buddy thoda confuse ho gaya 😅 Phir se try karo!"
-#         }
-# rag/generator.py
-# rag/generator.py
-# rag/generator.py
-# rag/generator.py
-# import os
-# from dotenv import load_dotenv
-# from functools import lru_cache
-# from groq import Groq
-# from rag.retriever import get_relevant_stories
-
-# load_dotenv()
-
-# # -------------------------------
-# # Groq Configuration
-# # -------------------------------
-# GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-# if not GROQ_API_KEY:
-#     raise RuntimeError("❌ GROQ_API_KEY not found in environment or .env file")
-
-# client = Groq(api_key=GROQ_API_KEY)
-
-# # Best model for Hinglish + speed
-# GROQ_MODEL = "llama-3.1-8b-instant"
-
-
-# # -------------------------------
-# # Query Rewriting (for retrieval)
-# # -------------------------------
-# @lru_cache(maxsize=256)
-# def rewrite_query_for_retrieval(query: str) -> str:
-#     """
-#     Rewrite indirect / kid-style questions into a form
-#     that matches story sentences better.
-#     """
-#     prompt = f"""
-# Rewrite the following question into a simple factual question
-# that would directly match a sentence in a story.
-
-# Do NOT answer the question.
-# Only rewrite it.
-
-# Question:
-# {query}
-
-# Rewritten question:
-# """
-
-#     completion = client.chat.completions.create(
-#         model=GROQ_MODEL,
-#         messages=[
-#             {"role": "system", "content": "You rewrite questions for retrieval only."},
-#             {"role": "user", "content": prompt},
-#         ],
-#         temperature=0.0,
-#         max_tokens=50,
-#     )
-
-#     return completion.choices[0].message.content.strip()
-
-
-# # -------------------------------
-# # Main Generator Function
-# # -------------------------------
-# def generate_llm_response(user_query: str, explain: bool = False):
-#     """
-#     Option 2 + Query Rewriting (Groq):
-#     - LLM self-verifies answers by quoting the story
-#     - Query rewritten ONLY for retrieval
-#     - No alias logic
-#     - No regex checks
-#     """
-
-#     # 1️⃣ Rewrite query ONLY for retrieval
-#     retrieval_query = rewrite_query_for_retrieval(user_query)
-
-#     # 2️⃣ Retrieve relevant story chunks
-#     relevant_chunks = get_relevant_stories(retrieval_query)
-
-#     if not relevant_chunks or len(relevant_chunks) == 0:
-#         return {
-#             "answer": "Unknown",
-#             "explanation": "Iska clear mention story mein nahi mila 📘"
-#         }
-
-#     context = "\n\n---\n\n".join(relevant_chunks)
-
-#     # 3️⃣ Unified prompt (ANSWER + PROOF)
-#     prompt = f"""
-# You are Chess Buddy, a careful story-based assistant for kids.
-# You must answer questions ONLY using the provided Story Context.
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# STEP 1 — Identify the QUESTION TYPE
-# ━━━━━━━━━━━━━━━━━━━━━━
-# First decide which category the question belongs to:
-
-# 1. Identity / Naming  
-#    (examples: "K kon hai?", "King ko kya kehte hai?", "Queen ka symbol kya hai?")
-
-# 2. Movement / Ability  
-#    (examples: "King kaise chalta hai?", "Pawn kya karta hai?")
-
-# 3. Story Event  
-#    (examples: "Story mein kya hua?", "Chintu ne kya kaha?")
-
-# 4. Moral / Learning  
-#    (examples: "Story se kya seekha?", "Raja important kyun hai?")
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# STEP 2 — Choose ALLOWED EVIDENCE (VERY STRICT)
-# ━━━━━━━━━━━━━━━━━━━━━━
-# Use ONLY the correct type of sentence from the story:
-
-# • Identity / Naming  
-#   → Sentences that explicitly DEFINE a name or symbol  
-#   → e.g. “sab mujhe K bulate hain”, “Main hoon Chessland ka King — K”
-
-# • Movement / Ability  
-#   → Sentences that describe how a piece moves or behaves  
-#   → e.g. “Raja sirf ek kadam chalta hai”
-
-# • Story Event  
-#   → Narrative actions or dialogue  
-#   → e.g. “Chintu ne kaha…”, “Board ne bataya…”
-
-# • Moral / Learning  
-#   → Reflective or lesson-based sentences  
-#   → e.g. “Agar raja pakda gaya, to game khatam”
-
-# ⚠️ DO NOT use sentences that merely mention a character
-# ⚠️ DO NOT mix different evidence types
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# STEP 3 — Decide ANSWER DIRECTION (for Identity questions)
-# ━━━━━━━━━━━━━━━━━━━━━━
-# If the story defines a relationship like:
-
-# NAME ↔ SYMBOL (example: King ↔ K)
-
-# Then:
-# • If the question asks “King ko kya kehte hai?” → answer = SYMBOL
-# • If the question asks “K kise kehte hai?” → answer = NAME
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# FAIL-SAFE RULE
-# ━━━━━━━━━━━━━━━━━━━━━━
-# If the story does NOT clearly contain the required evidence,
-# respond EXACTLY as follows and do not guess:
-
-# ANSWER: Unknown  
-# PROOF: Story me iska zikr nahi hai
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# STRICT OUTPUT FORMAT (NO EXTRA WORDS)
-# ━━━━━━━━━━━━━━━━━━━━━━
-
-# ANSWER: <short answer only>
-# PROOF: "<exact sentence(s) copied from the story>"
-
-# ━━━━━━━━━━━━━━━━━━━━━━
-# Story Context:
-# {context}
-
-# Question:
-# {user_query}
-
-# """
-
-#     # 4️⃣ Call Groq
-#     try:
-#         completion = client.chat.completions.create(
-#             model=GROQ_MODEL,
-#             messages=[
-#                 {
-#                     "role": "system",
-#                     "content": (
-#                         "You are a strict story-grounded assistant for kids. "
-#                         "Never invent facts. Always quote the story as proof. "
-#                         "Use natural Hinglish."
-#                     ),
-#                 },
-#                 {"role": "user", "content": prompt},
-#             ],
-#             temperature=0.2,
-#             max_tokens=250,
-#         )
-
-#         text = completion.choices[0].message.content.strip()
-
-#         # 5️⃣ Parse ANSWER and PROOF
-#         answer = "Unknown"
-#         proof = ""
-
-#         for line in text.splitlines():
-#             if line.startswith("ANSWER:"):
-#                 answer = line.replace("ANSWER:", "").strip()
-#             elif line.startswith("PROOF:"):
-#                 proof = line.replace("PROOF:", "").strip()
-
-#         if answer.lower() == "unknown":
-#             return {
-#                 "answer": "Unknown",
-#                 "explanation": "Iska clear mention story mein nahi mila 📘"
-#             }
-
-#         # 6️⃣ Human-style explanation
-#         explanation = (
-#             f"Yaad hai when story mein kaha gaya:\n"
-#             f"{proof}\n\n"
-#             f"Isliye is sawal ka jawab {answer} hai"
-#         )
-
-#         return {
-#             "answer": answer,
-#             "explanation": explanation
-#         }
-
-#     except Exception as e:
-#         print("❌ Groq Error:", e)
-#         return {
-#             "answer": "Error",
-#             "explanation": "Chess Buddy thoda confuse ho gaya Phir se try karo!"
-#         }
 import os
+import json
 from dotenv import load_dotenv
 from functools import lru_cache
-from groq import Groq
-from rag.retriever import get_relevant_stories
+from typing import Iterator
+from rag.retriever import get_relevant_stories, get_relevant_stories_batch
+from services.cache_service import response_cache, cache_key
+from services.groq_client import client
 
 load_dotenv()
 
@@ -574,8 +17,6 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise RuntimeError("❌ GROQ_API_KEY not found in environment or .env file")
 
-client = Groq(api_key=GROQ_API_KEY)
-
 # Best model for Hinglish + speed
 GROQ_MODEL = "llama-3.1-8b-instant"
 
@@ -618,41 +59,37 @@ Rewritten question:
 # -------------------------------
 # Main Generator Function
 # -------------------------------
-# -------------------------------
-# Main Generator Function
-# -------------------------------
-def generate_llm_response(user_query: str, explain: bool = False, language: str = "hinglish"):
+def _is_cacheable(result: dict) -> bool:
     """
-    Option 2 + Query Rewriting (Groq):
-    - LLM self-verifies answers by quoting the story
-    - Query rewritten ONLY for retrieval
-    - No alias logic
-    - No regex checks
+    Only cache real answers. An "Unknown" (retrieval miss or FAIL-SAFE reply)
+    or "Error" result is retried next time instead of sticking for CACHE_TTL.
+
+    Answers are sampled at temperature 0.2, but the prompt pins them to a
+    short answer plus an exact story quote, so a repeat call only rewords
+    the same fact; reusing it for CACHE_TTL is worth the skipped LLM call.
     """
+    return result["answer"] not in ("Unknown", "Error")
 
-    # 1️⃣ Rewrite query ONLY for retrieval
-    retrieval_query = rewrite_query_for_retrieval(user_query)
 
-    # 2️⃣ Retrieve relevant story chunks
-    relevant_chunks = get_relevant_stories(retrieval_query)
+def generate_llm_response(user_query: str, explain: bool = False, language: str = "hinglish"):
+    """
+    Cached entry point: repeat questions skip retrieval and the LLM call.
+    Unknown and error results are not cached (see _is_cacheable).
+    Callers get their own copy of the dict.
+    """
+    key = f"generate_llm_response:{cache_key(user_query, explain, language)}"
+    cached = response_cache.get(key)
+    if cached is not None:
+        return dict(cached)
 
-    if not relevant_chunks or len(relevant_chunks) == 0:
-        return {
-            "answer": "Unknown",
-            "explanation": "Iska clear mention story mein nahi mila 📘" if language == "hinglish" else "I couldn't find a clear mention of this in the story 📘"
-        }
+    result = _generate_llm_response(user_query, explain, language)
+    if _is_cacheable(result):
+        response_cache.set(key, dict(result))
+    return result
 
-    context = "\n\n---\n\n".join(relevant_chunks)
 
-    # Language-specific instructions
-    lang_instruction = "Use natural Hinglish."
-    if language == "en":
-        lang_instruction = "Respond in simple, kid-friendly English."
-    elif language == "hi":
-        lang_instruction = "Respond in simple Hindi (Devanagari)."
-
-    # 3️⃣ Unified prompt (ANSWER + PROOF)
-    prompt = f"""
+# Shared by the single and batched paths: evidence rules up to the output format
+STORY_RULES = """
 You are Chess Buddy, a careful story-based assistant for kids.
 You must answer questions ONLY using the provided Story Context.
 
@@ -721,7 +158,76 @@ PROOF: Story me iska zikr nahi hai
 ━━━━━━━━━━━━━━━━━━━━━━
 STRICT OUTPUT FORMAT (NO EXTRA WORDS)
 ━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+
+def _lang_instruction(language: str) -> str:
+    """Language-specific instructions for the system message."""
+    if language == "en":
+        return "Respond in simple, kid-friendly English."
+    elif language == "hi":
+        return "Respond in simple Hindi (Devanagari)."
+    return "Use natural Hinglish."
+
+
+def _system_message(language: str) -> dict:
+    """System message keeping the model grounded in the story."""
+    return {
+        "role": "system",
+        "content": (
+            "You are a strict story-grounded assistant for kids. "
+            "Never invent facts. Always quote the story as proof. "
+            f"{_lang_instruction(language)}"
+        ),
+    }
+
+
+def _not_found(language: str) -> dict:
+    """Result when retrieval finds no story chunks."""
+    return {
+        "answer": "Unknown",
+        "explanation": "Iska clear mention story mein nahi mila 📘" if language == "hinglish" else "I couldn't find a clear mention of this in the story 📘"
+    }
+
+
+def _story_result(answer: str, proof: str) -> dict:
+    """Turn the model's ANSWER + PROOF into the response dict."""
+    if answer.lower() == "unknown":
+        return {
+            "answer": "Unknown",
+            "explanation": "Iska clear mention story mein nahi mila 📘"
+        }
+
+    # 6️⃣ Human-style explanation
+    explanation = (
+        f"Yaad hai when story mein kaha gaya:\n"
+        f"{proof}\n\n"
+        f"Isliye is sawal ka jawab {answer} hai "
+    )
+
+    return {
+        "answer": answer,
+        "explanation": explanation
+    }
+
+
+def parse_story_response(text: str) -> dict:
+    """Parse the model's ANSWER/PROOF text (whole or streamed) into the response dict."""
+    answer = "Unknown"
+    proof = ""
+
+    for line in text.strip().splitlines():
+        if line.startswith("ANSWER:"):
+            answer = line.replace("ANSWER:", "").strip()
+        elif line.startswith("PROOF:"):
+            proof = line.replace("PROOF:", "").strip()
+
+    return _story_result(answer, proof)
+
 
+def _build_messages(user_query: str, context: str, language: str) -> list:
+    """System + user messages for one story question (ANSWER + PROOF format)."""
+    prompt = STORY_RULES + f"""
 ANSWER: <short answer only ({language})>
 PROOF: "<exact sentence(s) copied from the story>"
 
@@ -733,55 +239,43 @@ Question:
 {user_query}
 
 """
+    return [
+        _system_message(language),
+        {"role": "user", "content": prompt},
+    ]
 
-    # 4️⃣ Call Groq
+
+def _generate_llm_response(user_query: str, explain: bool = False, language: str = "hinglish"):
+    """
+    Option 2 + Query Rewriting (Groq):
+    - LLM self-verifies answers by quoting the story
+    - Query rewritten ONLY for retrieval
+    - No alias logic
+    - No regex checks
+    """
+
+    # 1️⃣ Rewrite query ONLY for retrieval
+    retrieval_query = rewrite_query_for_retrieval(user_query)
+
+    # 2️⃣ Retrieve relevant story chunks
+    relevant_chunks = get_relevant_stories(retrieval_query)
+
+    if not relevant_chunks or len(relevant_chunks) == 0:
+        return _not_found(language)
+
+    context = "\n\n---\n\n".join(relevant_chunks)
+
+    # 3️⃣ + 4️⃣ Unified prompt (ANSWER + PROOF), call Groq
     try:
         completion = client.chat.completions.create(
             model=GROQ_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a strict story-grounded assistant for kids. "
-                        "Never invent facts. Always quote the story as proof. "
-                        f"{lang_instruction}"
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
+            messages=_build_messages(user_query, context, language),
             temperature=0.2,
             max_tokens=250,
         )
 
-        text = completion.choices[0].message.content.strip()
-
         # 5️⃣ Parse ANSWER and PROOF
-        answer = "Unknown"
-        proof = ""
-
-        for line in text.splitlines():
-            if line.startswith("ANSWER:"):
-                answer = line.replace("ANSWER:", "").strip()
-            elif line.startswith("PROOF:"):
-                proof = line.replace("PROOF:", "").strip()
-
-        if answer.lower() == "unknown":
-            return {
-                "answer": "Unknown",
-                "explanation": "Iska clear mention story mein nahi mila 📘"
-            }
-
-        # 6️⃣ Human-style explanation
-        explanation = (
-            f"Yaad hai when story mein kaha gaya:\n"
-            f"{proof}\n\n"
-            f"Isliye is sawal ka jawab {answer} hai "
-        )
-
-        return {
-            "answer": answer,
-            "explanation": explanation
-        }
+        return parse_story_response(completion.choices[0].message.content)
 
     except Exception as e:
         print("❌ Groq Error:", e)
@@ -789,4 +283,141 @@ Question:
             "answer": "Error",
             "explanation": "Chess Buddy thoda confuse ho gaya, Phir se try karo!"
         }
-    
\ No newline at end of file
+
+
+# -------------------------------
+# Streaming Generator
+# -------------------------------
+def generate_llm_response_stream(user_query: str, explain: bool = False, language: str = "hinglish") -> Iterator[str]:
+    """
+    Same retrieval and prompt as generate_llm_response, but yields the raw
+    model text (ANSWER/PROOF lines) as it is generated; pass the joined
+    text to parse_story_response for the final answer/explanation.
+
+    A repeat question yields its cached text in one piece. A completed
+    stream also fills generate_llm_response's cache entry.
+    """
+    key = cache_key(user_query, explain, language)
+    stream_key = f"generate_llm_response_stream:{key}"
+    cached = response_cache.get(stream_key)
+    if cached is not None:
+        yield cached
+        return
+
+    relevant_chunks = get_relevant_stories(rewrite_query_for_retrieval(user_query))
+    if not relevant_chunks:
+        yield _not_found(language)["explanation"]
+        return
+
+    context = "\n\n---\n\n".join(relevant_chunks)
+
+    try:
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=_build_messages(user_query, context, language),
+            temperature=0.2,
+            max_tokens=250,
+            stream=True,
+        )
+        buf = []
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                buf.append(delta)
+                yield delta
+    except Exception as e:
+        print("❌ Groq Error:", e)
+        yield "Chess Buddy thoda confuse ho gaya, Phir se try karo!"
+        return
+
+    text = "".join(buf)
+    result = parse_story_response(text)
+    if _is_cacheable(result):
+        response_cache.set(stream_key, text)
+        response_cache.set(f"generate_llm_response:{key}", result)
+
+
+# -------------------------------
+# Batched Generator (one LLM call)
+# -------------------------------
+def generate_llm_response_batch(questions: list[str], language: str = "hinglish") -> list[dict]:
+    """
+    Answer several story questions with a single Groq call.
+
+    Each question keeps its own rewritten retrieval query and Story Context
+    (retrieved in one batch); all of them go into one prompt and come back
+    as JSON. Cached answers are
+    reused, and any question the reply misses falls back to
+    generate_llm_response.
+    """
+    results: list = [None] * len(questions)
+    uncached = []  # (index, cache key)
+
+    for i, question in enumerate(questions):
+        key = f"generate_llm_response:{cache_key(question, False, language)}"
+        cached = response_cache.get(key)
+        if cached is not None:
+            results[i] = dict(cached)
+        else:
+            uncached.append((i, key))
+
+    # One embedding pass + one vector query for every uncached question
+    retrieval_queries = [rewrite_query_for_retrieval(questions[i]) for i, _ in uncached]
+    all_chunks = get_relevant_stories_batch(retrieval_queries)
+
+    sections = []
+    pending = []  # (index, cache key)
+    for (i, key), relevant_chunks in zip(uncached, all_chunks):
+        question = questions[i]
+        if not relevant_chunks:
+            results[i] = _not_found(language)
+            continue
+
+        pending.append((i, key))
+        context = "\n\n---\n\n".join(relevant_chunks)
+        sections.append(
+            f"QUESTION {len(pending)}\n"
+            f"Story Context:\n{context}\n\n"
+            f"Question:\n{question}\n"
+        )
+
+    if pending:
+        prompt = STORY_RULES + f"""
+Answer EVERY question below separately, using ONLY its own Story Context.
+Respond with JSON:
+{{"results": [{{"question": 1, "answer": "<short answer only ({language})>", "proof": "<exact sentence(s) copied from the story>"}}, ...]}}
+Use "Unknown" as the answer (and "Story me iska zikr nahi hai" as proof) for the FAIL-SAFE case.
+
+━━━━━━━━━━━━━━━━━━━━━━
+""" + "\n━━━━━━━━━━━━━━━━━━━━━━\n".join(sections)
+
+        parsed = {}
+        try:
+            completion = client.chat.completions.create(
+                model=GROQ_MODEL,
+                messages=[
+                    _system_message(language),
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                max_tokens=250 * len(pending),
+                response_format={"type": "json_object"},
+            )
+            data = json.loads(completion.choices[0].message.content)
+            for item in data.get("results", []):
+                if isinstance(item, dict) and item.get("answer"):
+                    parsed[int(item.get("question", 0))] = item
+        except Exception as e:
+            print("❌ Groq batch error:", e)
+
+        for n, (i, key) in enumerate(pending, 1):
+            item = parsed.get(n)
+            if item is None:
+                results[i] = generate_llm_response(questions[i], language=language)
+                continue
+            result = _story_result(str(item["answer"]).strip(), str(item.get("proof", "")).strip())
+            if _is_cacheable(result):
+                response_cache.set(key, dict(result))
+            results[i] = result
+
+    return results
@@ -4,40 +4,16 @@ Rewrites Hindi/Hinglish user questions into canonical Hinglish chess questions.
 Uses Groq LLM with strict prompting and LRU caching.
 """
 
-import os
-from functools import lru_cache
-from groq import Groq
+import json
+import unicodedata
+from functools import lru_cache, wraps
+from services.groq_client import client
 
 
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+GROQ_MODEL = "llama-3.1-8b-instant"
 
-
-@lru_cache(maxsize=256)
-def normalize_query(raw_query: str) -> str:
-    """
-    Normalize a Hindi/Hinglish chess question into canonical form.
-    
-    This function ONLY rewrites questions - it does NOT answer them.
-    
-    Args:
-        raw_query: Raw text from STT or user typing (Hindi, Hinglish, or mixed)
-    
-    Returns:
-        Canonical Hinglish question (single line, standard chess terms, no punctuation)
-    
-    Examples:
-        "पोर्न कैसे अटैक करते हैं" → "pawn kaise attack karta hai"
-        "किंग कैसे चलता है" → "king kaise chalta hai"
-        "queen ki movement kya hai" → "queen kaise chalti hai"
-    """
-    
-    # If query is very short or already clean, return as-is
-    if len(raw_query.strip()) < 3:
-        return raw_query.strip()
-    
-    # Strict normalization prompt
-    system_prompt = """You are a QUERY REWRITER for a kids chess learning app.
+# Strict normalization prompt
+SYSTEM_PROMPT = """You are a QUERY REWRITER for a kids chess learning app.
 
 YOUR ONLY JOB: Rewrite Hindi/Hinglish questions into clean canonical Hinglish.
 
@@ -73,13 +49,66 @@ DO NOT:
 
 REMEMBER: You are a REWRITER, not an ANSWERER."""
 
+
+def _checked(raw_query: str, normalized: str) -> str:
+    """Safety check: if LLM returns something too long or off-topic, use original."""
+    if not normalized or len(normalized) > 200 or '\n' in normalized:
+        return raw_query.strip()
+    return normalized
+
+
+def _nfc_lru_cache(maxsize: int):
+    """
+    lru_cache keyed on the NFC form of the text argument.
+    
+    STT and keyboards can emit the same Devanagari as precomposed or
+    decomposed code points; NFC collapses them to one cache entry.
+    cache_info/cache_clear pass through, and __wrapped__ is the uncached function.
+    """
+    def decorator(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+        
+        @wraps(func)
+        def wrapper(text: str) -> str:
+            # ASCII is already NFC (isascii() reads a cached flag, no scan)
+            return cached(text if text.isascii() else unicodedata.normalize("NFC", text))
+        
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+    return decorator
+
+
+@_nfc_lru_cache(maxsize=1024)
+def normalize_query(raw_query: str) -> str:
+    """
+    Normalize a Hindi/Hinglish chess question into canonical form.
+    
+    This function ONLY rewrites questions - it does NOT answer them.
+    
+    Args:
+        raw_query: Raw text from STT or user typing (Hindi, Hinglish, or mixed)
+    
+    Returns:
+        Canonical Hinglish question (single line, standard chess terms, no punctuation)
+    
+    Examples:
+        "पोर्न कैसे अटैक करते हैं" → "pawn kaise attack karta hai"
+        "किंग कैसे चलता है" → "king kaise chalta hai"
+        "queen ki movement kya hai" → "queen kaise chalti hai"
+    """
+    
+    # If query is very short or already clean, return as-is
+    if len(raw_query.strip()) < 3:
+        return raw_query.strip()
+    
     user_prompt = f"Rewrite this question:\n{raw_query}"
     
     try:
         response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
+            model=GROQ_MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0,  # Zero creativity - strict rewriting only
@@ -88,12 +117,7 @@ REMEMBER: You are a REWRITER, not an ANSWERER."""
         )
         
         normalized = response.choices[0].message.content.strip()
-        
-        # Safety check: if LLM returns something too long or off-topic, use original
-        if len(normalized) > 200 or '\n' in normalized:
-            return raw_query.strip()
-        
-        return normalized
+        return _checked(raw_query, normalized)
         
     except Exception as e:
         # On error, return original query
@@ -103,15 +127,52 @@ REMEMBER: You are a REWRITER, not an ANSWERER."""
 
 def normalize_query_batch(queries: list[str]) -> list[str]:
     """
-    Normalize multiple queries at once (for testing/batch processing).
+    Normalize multiple queries with a single LLM call.
+    
+    The queries are sent as a numbered list and the model returns a JSON
+    object {"queries": [...]} in the same order. If the reply can't be
+    parsed or has the wrong length, falls back to normalize_query per query.
     
     Args:
         queries: List of raw queries
     
     Returns:
-        List of normalized queries
+        List of normalized queries (same order as input)
     """
-    return [normalize_query(q) for q in queries]
+    results = [q.strip() for q in queries]
+    pending = [i for i, q in enumerate(results) if len(q) >= 3]
+    if len(pending) <= 1:
+        return [normalize_query(q) for q in queries]
+    
+    numbered = "\n".join(f"{n}. {queries[i]}" for n, i in enumerate(pending, 1))
+    user_prompt = (
+        "Rewrite each of these questions separately.\n"
+        'Respond with JSON: {"queries": ["<rewrite of 1>", "<rewrite of 2>", ...]}\n\n'
+        f"{numbered}"
+    )
+    
+    try:
+        response = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0,
+            max_tokens=50 * len(pending),
+            top_p=1.0,
+            response_format={"type": "json_object"},
+        )
+        rewritten = json.loads(response.choices[0].message.content)["queries"]
+        if not isinstance(rewritten, list) or len(rewritten) != len(pending):
+            raise ValueError(f"expected {len(pending)} rewrites, got {len(rewritten)}")
+    except Exception as e:
+        print(f"Batch query normalization error: {e}")
+        return [normalize_query(q) for q in queries]
+    
+    for i, normalized in zip(pending, rewritten):
+        results[i] = _checked(queries[i], str(normalized).strip())
+    return results
 
 
 # Test function for development
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import List, Optional, Dict
 
 from rag.retriever import get_relevant_stories
@@ -32,6 +33,29 @@ def generate_response(question: str, explain: Optional[bool] = False, language:
     
     return response
 
+# Cap concurrent pipeline runs so parallel callers don't trip Groq rate limits.
+# A semaphore is bound to one event loop, so it is rebuilt for each new loop.
+LLM_MAX_CONCURRENCY = 8
+_llm_slots: Optional[asyncio.Semaphore] = None
+_llm_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def agenerate_response(question: str, explain: Optional[bool] = False, language: str = "hinglish") -> Dict[str, str]:
+    """Async wrapper around generate_response.
+
+    Runs the blocking pipeline in a worker thread, so several questions can
+    be awaited together (e.g. with asyncio.gather).
+    """
+    global _llm_slots, _llm_slots_loop
+    loop = asyncio.get_running_loop()
+    if _llm_slots is None or _llm_slots_loop is not loop:
+        _llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _llm_slots_loop = loop
+
+    async with _llm_slots:
+        return await asyncio.to_thread(generate_response, question, explain, language)
+
+
 def retrieve_chunks(question: str, top_k: int = 5) -> List[str]:
     """Return raw retrieved story chunks for the given question."""
     return get_relevant_stories(question, top_k=top_k)
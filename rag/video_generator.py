@@ -1,23 +1,18 @@
 # rag/video_generator.py - Enhanced Video Response Generator with Bilingual Support
 import os
-from groq import Groq
 from dotenv import load_dotenv
-from typing import Literal, Dict
+from typing import Literal, Dict, Iterator, List
 from functools import lru_cache
 
 from config import (
-    GROQ_API_KEY, GROQ_MODEL, GROQ_MAX_TOKENS, 
+    GROQ_MODEL, GROQ_MAX_TOKENS, 
     GROQ_TEMPERATURE, DEFAULT_LANGUAGE
 )
 from services.language_service import get_system_prompt, validate_language
+from services.groq_client import client
 
 load_dotenv()
 
-# Initialize Groq client
-client = None
-if GROQ_API_KEY:
-    client = Groq(api_key=GROQ_API_KEY)
-
 
 def generate_video_response(
     transcript: str, 
@@ -46,23 +41,10 @@ def generate_video_response(
     # Validate language
     language = validate_language(language)
     
-    # Truncate transcript if too long (Llama 3.1 8b has ~8k context)
-    max_chars = 18000
-    truncated_transcript = transcript[:max_chars] + ("..." if len(transcript) > max_chars else "")
-    
-    # Get language-specific system prompt
-    system_prompt = get_system_prompt(language)
-    
-    # Build user prompt based on language
-    prompt = _build_prompt(truncated_transcript, user_query, language)
-    
     try:
         completion = client.chat.completions.create(
             model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt},
-            ],
+            messages=_build_messages(transcript, user_query, language),
             temperature=GROQ_TEMPERATURE,
             max_tokens=GROQ_MAX_TOKENS,
         )
@@ -88,6 +70,74 @@ def generate_video_response(
         }
 
 
+def stream_video_response(
+    transcript: str,
+    user_query: str,
+    language: Literal["en", "hi", "hinglish"] = "hinglish"
+) -> Iterator[Dict[str, str]]:
+    """
+    Streaming variant of generate_video_response.
+    
+    Yields {"type": "delta", "text": ...} events as tokens arrive, then one
+    {"type": "final", "answer": ..., "explanation": ..., "language": ...} event
+    parsed from the full text.
+    """
+    language = validate_language(language)
+    
+    if not client:
+        yield {
+            "type": "final",
+            "answer": "Error",
+            "explanation": "Groq API key not configured.",
+            "language": language
+        }
+        return
+    
+    parts = []
+    try:
+        stream = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=_build_messages(transcript, user_query, language),
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+            stream=True,
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield {"type": "delta", "text": delta}
+    except Exception as e:
+        print(f"❌ Groq streaming error: {e}")
+        yield {
+            "type": "final",
+            "answer": "Error",
+            "explanation": _get_error_message(language),
+            "language": language
+        }
+        return
+    
+    answer, explanation = _parse_response("".join(parts).strip(), language)
+    yield {
+        "type": "final",
+        "answer": answer,
+        "explanation": explanation,
+        "language": language
+    }
+
+
+def _build_messages(transcript: str, user_query: str, language: str) -> List[Dict[str, str]]:
+    """Build the chat messages (system + transcript-grounded user prompt)."""
+    # Truncate transcript if too long (Llama 3.1 8b has ~8k context)
+    max_chars = 18000
+    truncated_transcript = transcript[:max_chars] + ("..." if len(transcript) > max_chars else "")
+    
+    return [
+        {"role": "system", "content": get_system_prompt(language)},
+        {"role": "user", "content": _build_prompt(truncated_transcript, user_query, language)},
+    ]
+
+
 def _build_prompt(transcript: str, query: str, language: str) -> str:
     """Build language-specific prompt."""
     
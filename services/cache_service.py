@@ -1,58 +1,63 @@
 # services/cache_service.py - In-memory caching with TTL
 import time
 import hashlib
+import threading
 from typing import Any, Dict, Optional
 from functools import wraps
 from config import CACHE_ENABLED, CACHE_TTL, TRANSCRIPT_CACHE_TTL, RESPONSE_CACHE_MAX_SIZE
 
 
 class TTLCache:
-    """Simple in-memory cache with TTL (time-to-live) support."""
+    """Simple in-memory cache with TTL (time-to-live) support.
+    
+    Thread-safe: request handlers call it from worker threads.
+    """
     
     def __init__(self, max_size: int = 256, default_ttl: int = 3600):
         self._cache: Dict[str, tuple] = {}  # {key: (value, expiry_time)}
         self._max_size = max_size
         self._default_ttl = default_ttl
+        self._lock = threading.Lock()
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired."""
         if not CACHE_ENABLED:
             return None
-            
-        if key in self._cache:
-            value, expiry = self._cache[key]
-            if time.time() < expiry:
-                return value
-            else:
-                # Expired, remove it
-                del self._cache[key]
+        
+        with self._lock:
+            if key in self._cache:
+                value, expiry = self._cache[key]
+                if time.time() < expiry:
+                    return value
+                else:
+                    # Expired, remove it
+                    del self._cache[key]
         return None
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache with TTL."""
         if not CACHE_ENABLED:
             return
-            
-        # Evict oldest if at capacity
-        if len(self._cache) >= self._max_size:
-            self._evict_oldest()
         
         expiry = time.time() + (ttl or self._default_ttl)
-        self._cache[key] = (value, expiry)
+        with self._lock:
+            # Evict oldest if at capacity
+            if key not in self._cache and len(self._cache) >= self._max_size:
+                self._evict_oldest()
+            self._cache[key] = (value, expiry)
     
     def delete(self, key: str) -> bool:
         """Delete a key from cache."""
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        with self._lock:
+            return self._cache.pop(key, None) is not None
     
     def clear(self) -> None:
         """Clear all cache entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
     
     def _evict_oldest(self) -> None:
-        """Remove the oldest entry based on expiry time."""
+        """Remove the oldest entry based on expiry time (caller holds the lock)."""
         if not self._cache:
             return
         oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k][1])
@@ -60,9 +65,12 @@ class TTLCache:
     
     def stats(self) -> dict:
         """Get cache statistics."""
-        valid_count = sum(1 for _, (_, exp) in self._cache.items() if time.time() < exp)
+        now = time.time()
+        with self._lock:
+            total = len(self._cache)
+            valid_count = sum(1 for _, exp in self._cache.values() if now < exp)
         return {
-            "total_entries": len(self._cache),
+            "total_entries": total,
             "valid_entries": valid_count,
             "max_size": self._max_size
         }
@@ -0,0 +1,30 @@
+# services/groq_client.py - Shared Groq client (one keep-alive connection pool)
+import httpx
+from groq import Groq
+
+from config import GROQ_API_KEY, GROQ_TIMEOUT
+
+# Every module imports this client, so the TCP/TLS connection is opened once
+# per process and reused by all LLM calls
+client = None
+if GROQ_API_KEY:
+    client = Groq(
+        api_key=GROQ_API_KEY,
+        timeout=GROQ_TIMEOUT,
+        http_client=httpx.Client(
+            transport=httpx.HTTPTransport(
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                retries=2,
+            ),
+        ),
+    )
+
+
+def warm_groq_client() -> None:
+    """Open the pooled connection ahead of the first real request."""
+    if not client:
+        return
+    try:
+        client.models.list()
+    except Exception as e:
+        print(f"⚠️ Groq warm-up failed: {e}")
@@ -1,4 +1,7 @@
 # services/language_service.py - Bilingual response generation (Hindi/English/Hinglish)
+import gc
+import re
+from functools import lru_cache
 from typing import Literal
 from config import SUPPORTED_LANGUAGES, DEFAULT_LANGUAGE, LanguageType
 
@@ -133,22 +136,33 @@ Bacchon ke liye educational aur fun banao! 🎓♟️"""
 }
 
 
+@lru_cache(maxsize=16)
 def get_system_prompt(language: LanguageType = DEFAULT_LANGUAGE) -> str:
     """Get system prompt for the specified language."""
     return SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS["hinglish"])
 
 
+@lru_cache(maxsize=16)
+def get_explanation_prompt_template(
+    mode: Literal["what", "why", "full"],
+    language: LanguageType = DEFAULT_LANGUAGE
+) -> str:
+    """Get the raw (unformatted) explanation prompt for a mode and language."""
+    prompt_template = VIDEO_EXPLAIN_PROMPTS.get(mode, VIDEO_EXPLAIN_PROMPTS["full"])
+    return prompt_template.get(language, prompt_template["hinglish"])
+
+
 def get_explanation_prompt(
     mode: Literal["what", "why", "full"],
     topic: str,
     language: LanguageType = DEFAULT_LANGUAGE
 ) -> str:
     """Get explanation prompt for the specified mode and language."""
-    prompt_template = VIDEO_EXPLAIN_PROMPTS.get(mode, VIDEO_EXPLAIN_PROMPTS["full"])
-    language_prompt = prompt_template.get(language, prompt_template["hinglish"])
-    return language_prompt.format(topic=topic)
+    # Topic is unbounded, so only the template lookup is cached
+    return get_explanation_prompt_template(mode, language).format(topic=topic)
 
 
+@lru_cache(maxsize=16)
 def validate_language(language: str) -> LanguageType:
     """Validate and return language, defaulting if invalid."""
     if language in SUPPORTED_LANGUAGES:
@@ -156,14 +170,19 @@ def validate_language(language: str) -> LanguageType:
     return DEFAULT_LANGUAGE
 
 
+# Character classes for detect_language (scanned by the C regex engine)
+_DEVA_RE = re.compile(r"[\u0900-\u097F]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+
+
 def detect_language(text: str) -> LanguageType:
     """
     Simple heuristic language detection.
     Returns detected language based on character analysis.
     """
     # Check for Hindi/Devanagari characters
-    hindi_chars = sum(1 for c in text if '\u0900' <= c <= '\u097F')
-    english_chars = sum(1 for c in text if c.isalpha() and c.isascii())
+    hindi_chars = len(_DEVA_RE.findall(text))
+    english_chars = len(_LATIN_RE.findall(text))
     
     total_chars = hindi_chars + english_chars
     if total_chars == 0:
@@ -180,6 +199,7 @@ def detect_language(text: str) -> LanguageType:
 
 
 # Response formatting helpers
+@lru_cache(maxsize=16)
 def format_response_header(language: LanguageType) -> str:
     """Get response header in the specified language."""
     headers = {
@@ -190,6 +210,7 @@ def format_response_header(language: LanguageType) -> str:
     return headers.get(language, headers["hinglish"])
 
 
+@lru_cache(maxsize=16)
 def format_not_found_message(language: LanguageType) -> str:
     """Get 'not found' message in the specified language."""
     messages = {
@@ -198,3 +219,10 @@ def format_not_found_message(language: LanguageType) -> str:
         "hinglish": "Yeh info video mein nahi mili. Kuch aur poochoge? 🤔"
     }
     return messages.get(language, messages["hinglish"])
+
+
+# Prompt dicts are long-lived: move them (and everything imported so far) to the
+# permanent generation so request-time GC cycles don't rescan them.
+# NOTE: if this module is reloaded (e.g. importlib.reload), call gc.unfreeze() first.
+gc.collect()
+gc.freeze()
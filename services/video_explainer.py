@@ -1,30 +1,58 @@
 # services/video_explainer.py - AI Video Concept Explanation Service
 import os
 import re
+import json
+from functools import lru_cache
 from typing import Literal, List, Dict, Optional
-from groq import Groq
 from dotenv import load_dotenv
 
 from config import (
-    GROQ_API_KEY, GROQ_MODEL, GROQ_MAX_TOKENS, 
+    GROQ_MODEL, GROQ_MAX_TOKENS, 
     GROQ_TEMPERATURE, DEFAULT_LANGUAGE, LanguageType
 )
 from services.language_service import (
-    get_system_prompt, get_explanation_prompt, 
+    get_system_prompt, get_explanation_prompt_template, 
     validate_language, format_not_found_message
 )
 from services.cache_service import cached_response
+from services.groq_client import client
 
 load_dotenv()
 
-# Initialize Groq client
-client = None
-if GROQ_API_KEY:
-    client = Groq(api_key=GROQ_API_KEY)
-else:
+if not client:
     print("⚠️ Warning: GROQ_API_KEY not found - Video explainer will not work")
 
 
+@lru_cache(maxsize=4)
+def _truncate_transcript(transcript: str, max_chars: int) -> str:
+    """
+    Shared across explainers and calls for the few videos in use, so every
+    prompt about a video starts with the exact same transcript text
+    (lets the provider reuse its cached prompt prefix).
+    """
+    if len(transcript) <= max_chars:
+        return transcript
+    
+    cut = transcript.rfind(' ', 0, max_chars)
+    if cut <= 0:
+        cut = max_chars
+    return transcript[:cut] + "..."
+
+
+_LANGUAGE_NAMES = {"en": "English", "hi": "Hindi (Devanagari)", "hinglish": "Hinglish"}
+
+
+def _error_result(message: str, language: str, mode: str) -> Dict[str, str]:
+    """Build an error response with the same keys as a successful explanation."""
+    return {
+        "explanation": message,
+        "key_points": [],
+        "language": language,
+        "mode": mode,
+        "status": "error"
+    }
+
+
 class VideoExplainer:
     """
     AI-powered video concept explainer.
@@ -35,6 +63,36 @@ class VideoExplainer:
         self.language = validate_language(language)
         self.client = client
         self.model = GROQ_MODEL
+        # Prompts only depend on language, so resolve them once per instance
+        self._system_prompt = get_system_prompt(self.language)
+        self._prompt_templates = {
+            m: get_explanation_prompt_template(m, self.language)
+            for m in ("what", "why", "full")
+        }
+    
+    def explain(
+        self,
+        transcript: str,
+        topic: str,
+        mode: Literal["what", "why", "full"] = "full",
+        language: Optional[LanguageType] = None
+    ) -> Dict[str, str]:
+        """
+        Explain a topic in any mode, optionally in a different language.
+        
+        Lets one explainer (and its Groq client) serve every language
+        instead of constructing a new one per request.
+        
+        Args:
+            transcript: Video transcript text
+            topic: Topic to explain
+            mode: "what", "why", or "full"
+            language: Override for this call (defaults to the explainer's language)
+            
+        Returns:
+            Dict with 'explanation' and 'key_points'
+        """
+        return self._generate_explanation(transcript, topic, mode, language)
     
     def explain_what(self, transcript: str, topic: str) -> Dict[str, str]:
         """
@@ -75,6 +133,122 @@ class VideoExplainer:
         """
         return self._generate_explanation(transcript, topic, "full")
     
+    def explain_batch(self, transcript: str, tasks: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Answer several explanation tasks about one transcript in one LLM call
+        per language.
+        
+        Tasks are grouped by language so each call gets that language's
+        system prompt; the model returns a JSON object with one entry per
+        task. Tasks the reply misses fall back to a single call.
+        
+        Args:
+            transcript: Video transcript text
+            tasks: Dicts with 'topic', 'mode' and optional 'language'
+                   (defaults to the explainer's language)
+            
+        Returns:
+            One explanation dict per task, in the same order
+        """
+        tasks = [
+            {
+                "topic": t["topic"],
+                "mode": t.get("mode", "full"),
+                "language": validate_language(t.get("language") or self.language)
+            }
+            for t in tasks
+        ]
+        if not tasks:
+            return []
+        if not self.client:
+            return [
+                _error_result("AI service is not configured.", t["language"], t["mode"])
+                for t in tasks
+            ]
+        
+        truncated = self._truncate_transcript(transcript)
+        by_language: Dict[str, List[int]] = {}
+        for i, t in enumerate(tasks):
+            by_language.setdefault(t["language"], []).append(i)
+        
+        parsed = {}
+        for language, indices in by_language.items():
+            replies = self._explain_batch_call(truncated, [tasks[i] for i in indices], language)
+            for n, i in enumerate(indices, 1):
+                if n in replies:
+                    parsed[i] = replies[n]
+        
+        results = []
+        for i, t in enumerate(tasks):
+            item = parsed.get(i)
+            if item is None:
+                results.append(self.explain(transcript, t["topic"], t["mode"], t["language"]))
+                continue
+            results.append({
+                "explanation": str(item["explanation"]).strip(),
+                "key_points": [str(p) for p in item.get("key_points") or []][:5],
+                "language": t["language"],
+                "mode": t["mode"],
+                "status": "success"
+            })
+        return results
+    
+    def _explain_batch_call(
+        self,
+        truncated: str,
+        tasks: List[Dict[str, str]],
+        language: str
+    ) -> Dict[int, Dict]:
+        """Send same-language tasks in one JSON-mode call; returns replies keyed by 1-based task number."""
+        task_lines = "\n\n".join(
+            f"TASK {i} (answer in {_LANGUAGE_NAMES[language]}):\n"
+            + get_explanation_prompt_template(t["mode"], language).format(topic=t["topic"])
+            for i, t in enumerate(tasks, 1)
+        )
+        
+        full_prompt = f"""VIDEO TRANSCRIPT:
+{truncated}
+
+{task_lines}
+
+IMPORTANT:
+- Answer each task separately, ONLY based on what's in the transcript
+- If a topic is not covered, say so politely
+- Include 2-3 key points to remember per task
+- End each explanation with encouraging words for the child
+
+FORMAT (JSON):
+{{"results": [{{"task": 1, "explanation": "<your explanation>", "key_points": ["Point 1", "Point 2"]}}, ...]}}
+"""
+
+        if language == self.language:
+            system_prompt = self._system_prompt
+        else:
+            system_prompt = get_system_prompt(language)
+        
+        parsed = {}
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": full_prompt}
+                ],
+                temperature=GROQ_TEMPERATURE,
+                max_tokens=GROQ_MAX_TOKENS * len(tasks),
+                response_format={"type": "json_object"}
+            )
+            
+            data = json.loads(completion.choices[0].message.content)
+            for item in data.get("results", []):
+                if isinstance(item, dict) and item.get("explanation"):
+                    parsed[int(item.get("task", 0))] = item
+                    
+        except Exception as e:
+            print(f"❌ Batch explanation error: {e}")
+        
+        return parsed
+    
     def extract_key_concepts(self, transcript: str) -> List[Dict[str, str]]:
         """
         Extract key chess concepts from the video transcript.
@@ -130,24 +304,25 @@ Extract the concepts:"""
         self, 
         transcript: str, 
         topic: str, 
-        mode: Literal["what", "why", "full"]
+        mode: Literal["what", "why", "full"],
+        language: Optional[LanguageType] = None
     ) -> Dict[str, str]:
         """Internal method to generate explanations."""
+        language = validate_language(language) if language else self.language
         if not self.client:
-            return {
-                "explanation": "AI service is not configured.",
-                "key_points": [],
-                "language": self.language,
-                "mode": mode,
-                "status": "error"
-            }
+            return _error_result("AI service is not configured.", language, mode)
         
         # Truncate transcript
         truncated = self._truncate_transcript(transcript)
         
         # Get language-specific prompts
-        system_prompt = get_system_prompt(self.language)
-        user_prompt = get_explanation_prompt(mode, topic, self.language)
+        if language == self.language:
+            system_prompt = self._system_prompt
+            template = self._prompt_templates.get(mode, self._prompt_templates["full"])
+        else:
+            system_prompt = get_system_prompt(language)
+            template = get_explanation_prompt_template(mode, language)
+        user_prompt = template.format(topic=topic)
         
         full_prompt = f"""VIDEO TRANSCRIPT:
 {truncated}
@@ -181,25 +356,17 @@ KEY POINTS:
             )
             
             response_text = completion.choices[0].message.content.strip()
-            return self._parse_explanation(response_text, mode)
+            return self._parse_explanation(response_text, mode, language)
             
         except Exception as e:
             print(f"❌ Explanation generation error: {e}")
-            return {
-                "explanation": format_not_found_message(self.language),
-                "key_points": [],
-                "language": self.language,
-                "mode": mode,
-                "status": "error"
-            }
+            return _error_result(format_not_found_message(language), language, mode)
     
     def _truncate_transcript(self, transcript: str, max_chars: int = 15000) -> str:
-        """Truncate transcript to fit context window."""
-        if len(transcript) <= max_chars:
-            return transcript
-        return transcript[:max_chars] + "..."
+        """Truncate transcript to fit context window, cutting at a word boundary."""
+        return _truncate_transcript(transcript, max_chars)
     
-    def _parse_explanation(self, response: str, mode: str) -> Dict[str, str]:
+    def _parse_explanation(self, response: str, mode: str, language: Optional[str] = None) -> Dict[str, str]:
         """Parse LLM response into structured format."""
         explanation = response
         key_points = []
@@ -226,7 +393,7 @@ KEY POINTS:
         return {
             "explanation": explanation,
             "key_points": key_points if key_points else self._extract_bullet_points(response),
-            "language": self.language,
+            "language": language or self.language,
             "mode": mode,
             "status": "success"
         }
@@ -263,6 +430,9 @@ KEY POINTS:
 
 
 # Convenience functions for direct use
+# One explainer serves every language (see VideoExplainer.explain)
+_shared_explainer = VideoExplainer()
+
 def explain_video_concept(
     transcript: str,
     topic: str,
@@ -281,17 +451,35 @@ def explain_video_concept(
     Returns:
         Explanation dict with 'explanation', 'key_points', 'language', 'mode'
     """
-    explainer = VideoExplainer(language=language)
+    return _shared_explainer.explain(transcript, topic, mode, language)
+
+
+def batch_explain_video_concepts(
+    transcript: str,
+    tasks: List[Dict[str, str]],
+    language: LanguageType = DEFAULT_LANGUAGE
+) -> List[Dict[str, str]]:
+    """
+    Explain several (topic, mode, language) tasks about one video in one LLM call.
     
-    if mode == "what":
-        return explainer.explain_what(transcript, topic)
-    elif mode == "why":
-        return explainer.explain_why(transcript, topic)
-    else:
-        return explainer.explain_full(transcript, topic)
+    Args:
+        transcript: Video transcript
+        tasks: Dicts with 'topic', 'mode' and optional 'language'
+        language: Default language for tasks that don't set one
+        
+    Returns:
+        List of explanation dicts, one per task
+    """
+    return _shared_explainer.explain_batch(
+        transcript,
+        [{**t, "language": t.get("language") or language} for t in tasks]
+    )
 
 
 def get_video_concepts(transcript: str, language: LanguageType = DEFAULT_LANGUAGE) -> List[Dict[str, str]]:
-    """Extract key concepts from a video transcript."""
-    explainer = VideoExplainer(language=language)
-    return explainer.extract_key_concepts(transcript)
+    """Extract key concepts from a video transcript.
+    
+    Extraction doesn't depend on language (kept for API compatibility),
+    so the shared explainer serves every request.
+    """
+    return _shared_explainer.extract_key_concepts(transcript)
@@ -1,6 +1,9 @@
 # services/video_processor.py - Enhanced Video Processing with Caching
+import gc
+import io
 import os
 import re
+import threading
 import yt_dlp
 from faster_whisper import WhisperModel
 from typing import Dict, Optional
@@ -26,22 +29,36 @@ os.makedirs(TEMP_AUDIO_DIR, exist_ok=True)
 
 # Initialize Whisper model (lazy loading)
 _whisper_model: Optional[WhisperModel] = None
+_whisper_lock = threading.Lock()
 
 
 def get_whisper_model() -> WhisperModel:
     """Lazy load whisper model to avoid slow startup."""
     global _whisper_model
     if _whisper_model is None:
-        print(f"🔄 Loading Whisper model: {WHISPER_MODEL}")
-        _whisper_model = WhisperModel(
-            WHISPER_MODEL, 
-            device=WHISPER_DEVICE, 
-            compute_type=WHISPER_COMPUTE_TYPE
-        )
-        print(f"✅ Whisper model loaded successfully")
+        # Lock so a request racing the startup warm-up doesn't load twice
+        with _whisper_lock:
+            if _whisper_model is None:
+                print(f"🔄 Loading Whisper model: {WHISPER_MODEL}")
+                _whisper_model = WhisperModel(
+                    WHISPER_MODEL, 
+                    device=WHISPER_DEVICE, 
+                    compute_type=WHISPER_COMPUTE_TYPE
+                )
+                print(f"✅ Whisper model loaded successfully")
+                # Model lives for the whole process - keep it out of GC scans
+                gc.collect()
+                gc.freeze()
     return _whisper_model
 
 
+def warm_whisper_model() -> threading.Thread:
+    """Load the Whisper model in a background thread (called at app startup)."""
+    thread = threading.Thread(target=get_whisper_model, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
 def generate_video_id(video_url: str) -> str:
     """Generate a consistent ID for a video URL."""
     return hashlib.md5(video_url.encode()).hexdigest()[:12]
@@ -187,12 +204,12 @@ def transcribe_audio(file_path: str, language: str = None) -> Dict[str, str]:
             vad_filter=True,  # Filter out silence for speed
         )
         
-        # Collect all segments
-        transcript_parts = []
+        # Segment text already carries its leading space; strip once at the end
+        buf = io.StringIO()
         for segment in segments:
-            transcript_parts.append(segment.text.strip())
+            buf.write(segment.text)
         
-        full_transcript = " ".join(transcript_parts)
+        full_transcript = buf.getvalue().strip()
         
         return {
             "status": "success",
@@ -320,11 +337,12 @@ def cleanup_temp_files() -> Dict[str, int]:
     """Clean up temporary audio files."""
     count = 0
     try:
-        for filename in os.listdir(TEMP_AUDIO_DIR):
-            file_path = os.path.join(TEMP_AUDIO_DIR, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                count += 1
+        # scandir reuses the readdir file type, so no stat per entry
+        with os.scandir(TEMP_AUDIO_DIR) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    os.remove(entry.path)
+                    count += 1
     except Exception as e:
         return {"status": "error", "message": str(e)}
     
@@ -1,15 +1,34 @@
 import streamlit as st
-import tempfile
-import asyncio
-import base64
 import requests
 import json
-import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # -------------------------------
 # Configuration
 # -------------------------------
 API_BASE_URL = "http://localhost:8080/api"
+API_TIMEOUT = (1, 30)  # (connect, read) seconds
+VIDEO_PROCESS_TIMEOUT = (1, 600)  # download + transcription can take minutes
+HEALTH_TIMEOUT = (0.2, 0.5)  # keep reruns snappy even when the API is down
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive session for every API call, kept across reruns."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    ))
+    return session
+
+@st.cache_resource
+def get_tts_executor():
+    """Background TTS fetches overlap with rendering the answer (pool kept across reruns)."""
+    return ThreadPoolExecutor(max_workers=2)
 
 # -------------------------------
 # Page Config
@@ -25,10 +44,11 @@ st.title("🤖 Chess Buddy — Your Magical Chess Friend!")
 # -------------------------------
 # API Client Helpers
 # -------------------------------
+@st.cache_data(ttl=5, show_spinner=False)
 def check_api_health():
-    """Check if API is running."""
+    """Check if API is running (cached for a few seconds across reruns)."""
     try:
-        response = requests.get("http://localhost:8080/health", timeout=2)
+        response = get_session().get("http://localhost:8080/health", timeout=HEALTH_TIMEOUT)
         return response.status_code == 200
     except:
         return False
@@ -36,10 +56,10 @@ def check_api_health():
 def api_chat(question, language="hinglish"):
     """Call Chat API."""
     try:
-        response = requests.post(f"{API_BASE_URL}/chat", json={
+        response = get_session().post(f"{API_BASE_URL}/chat", json={
             "question": question,
             "explain": True
-        })
+        }, timeout=API_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return {"answer": "Error", "explanation": f"API Error: {response.status_code}"}
@@ -49,63 +69,178 @@ def api_chat(question, language="hinglish"):
 def api_process_video(url):
     """Call Video Process API."""
     try:
-        response = requests.post(f"{API_BASE_URL}/video/process", json={"url": url})
+        response = get_session().post(f"{API_BASE_URL}/video/process", json={"url": url}, timeout=VIDEO_PROCESS_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return {"status": "error", "message": f"API Error: {response.text}"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def api_video_chat(video_id, question, language="hinglish"):
-    """Call Video Chat API."""
+def api_video_chat_stream(video_id, question, language, final):
+    """Stream Video Chat API tokens; the parsed answer/explanation land in `final`."""
     try:
-        response = requests.post(f"{API_BASE_URL}/video/chat", json={
+        with get_session().post(f"{API_BASE_URL}/video/chat/stream", json={
             "video_id": video_id,
             "question": question,
             "language": language
-        })
-        if response.status_code == 200:
-            return response.json()
-        return {"answer": "Error", "explanation": f"API Error: {response.text}"}
+        }, timeout=API_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                final.update({"answer": "Error", "explanation": f"API Error: {response.text}"})
+                return
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("type") == "delta":
+                    yield event["text"]
+                else:
+                    final.update(event)
     except Exception as e:
-        return {"answer": "Error", "explanation": str(e)}
+        final.update({"answer": "Error", "explanation": str(e)})
 
 def api_video_explain(video_id, topic, mode="full", language="hinglish"):
     """Call Video Explain API."""
     try:
-        response = requests.post(f"{API_BASE_URL}/video/explain", json={
+        response = get_session().post(f"{API_BASE_URL}/video/explain", json={
             "video_id": video_id,
             "topic": topic,
             "mode": mode,
             "language": language
-        })
+        }, timeout=API_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return {"explanation": f"API Error: {response.text}"}
     except Exception as e:
         return {"explanation": str(e)}
 
-def api_get_tts_audio(text, language="auto"):
-    """Get TTS Audio from API."""
+def api_speech_to_text(audio_bytes):
+    """Transcribe a browser-recorded WAV clip via the STT API (Hindi/English auto-detect)."""
     try:
-        response = requests.post(f"{API_BASE_URL}/tts", json={
-            "text": text,
-            "language": language
-        })
+        response = get_session().post(
+            f"{API_BASE_URL}/stt",
+            files={"audio": ("voice.wav", audio_bytes, "audio/wav")},
+            data={"language": "auto"},
+            timeout=API_TIMEOUT
+        )
         if response.status_code == 200:
-            return response.content
+            return response.json().get("text", "")
+        return ""
+    except:
+        return ""
+
+def fetch_tts_bytes(session, text, language="auto"):
+    """POST /tts and return the audio bytes (raises on failure).
+
+    Makes no Streamlit calls, so it is safe to run in worker threads.
+    """
+    response = session.post(f"{API_BASE_URL}/tts", json={
+        "text": text,
+        "language": language
+    }, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+def _fetch_tts_or_none(session, text, language="auto"):
+    try:
+        return fetch_tts_bytes(session, text, language)
+    except:
+        return None
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def synthesize_speech(text, language="auto"):
+    """Fetch TTS audio once per (text, language); reruns reuse the cached bytes.
+
+    Raises on failure so errors are never cached.
+    """
+    return fetch_tts_bytes(get_session(), text, language)
+
+def api_get_tts_audio(text, language="auto"):
+    """Get TTS Audio from API."""
+    if not text or not text.strip():
         return None
+    try:
+        return synthesize_speech(text.strip(), language)
     except:
         return None
 
+def prefetch_tts(text, language="auto"):
+    """Start fetching TTS audio in the background; returns a Future (bytes or None)."""
+    if not text or not text.strip():
+        return None
+    # Session is resolved here, on the script thread; the worker only does HTTP
+    return get_tts_executor().submit(_fetch_tts_or_none, get_session(), text.strip(), language)
+
 # -------------------------------
 # UI Components
 # -------------------------------
 def autoplay_audio(audio_bytes):
-    """Play audio bytes automatically."""
+    """Play audio bytes automatically (served as a media file, not inline base64)."""
     if not audio_bytes: return
-    b64 = base64.b64encode(audio_bytes).decode()
-    st.markdown(f'<audio autoplay><source src="data:audio/mp3;base64,{b64}"></audio>', unsafe_allow_html=True)
+    st.audio(audio_bytes, format="audio/mp3", autoplay=True)
+
+def show_explanation(explanation, idx, scope="story"):
+    """Explanation expander with a Listen button (audio is usually prefetched).
+
+    The expander opens and closes in the browser without a Python rerun.
+    """
+    with st.expander("💡 Explain"):
+        st.markdown(explanation)
+        if st.button("🔊 Listen", key=f"listen_{scope}_{idx}"):
+            future = st.session_state.tts_prefetch.pop(explanation, None)
+            audio_bytes = future.result() if future else None
+            autoplay_audio(audio_bytes or api_get_tts_audio(explanation))
+
+def render_message(idx, msg, scope="story"):
+    """Render one chat message (user text, or assistant answer + explanation).
+
+    Messages flagged `inline` (Video Tutor explain buttons) show the
+    explanation directly, since it is the whole reply.
+    """
+    with st.chat_message(msg["role"]):
+        if msg["role"] == "assistant":
+            st.markdown(f"**{msg['answer']}**")
+            if msg.get("explanation"):
+                if msg.get("inline"):
+                    st.markdown(f"_{msg['explanation']}_")
+                else:
+                    show_explanation(msg["explanation"], idx, scope)
+        else:
+            st.markdown(msg["content"])
+
+def render_chat(messages, scope="story"):
+    """Render a whole chat history."""
+    for idx, msg in enumerate(messages):
+        render_message(idx, msg, scope)
+
+@st.fragment
+def video_explain_panel(video_id):
+    """Explain buttons + video chat history.
+
+    Runs as a fragment: clicking a button reruns only this panel, not the
+    sidebar health check or the Story Mode tab.
+    """
+    language = st.session_state.language
+    
+    # Helper Buttons for Explain API
+    c1, c2, c3 = st.columns(3)
+    if c1.button("🤔 What is this?"):
+        with st.spinner("Thinking..."):
+            res = api_video_explain(video_id, "current situation", "what", language)
+            st.session_state.video_messages.append({"role": "assistant", "answer": "Explanation (What)", "explanation": res.get("explanation"), "inline": True})
+    
+    if c2.button("🧠 Why this move?"):
+        with st.spinner("Thinking..."):
+            res = api_video_explain(video_id, "latest move", "why", language)
+            st.session_state.video_messages.append({"role": "assistant", "answer": "Explanation (Why)", "explanation": res.get("explanation"), "inline": True})
+    
+    if c3.button("📝 Key Concepts"):
+        with st.spinner("Extracting..."):
+            res = get_session().get(f"{API_BASE_URL}/video/concepts/{video_id}", timeout=API_TIMEOUT).json()
+            concepts = "\n".join([f"- **{c['name']}**: {c.get('description','')}" for c in res.get('concepts', [])])
+            st.session_state.video_messages.append({"role": "assistant", "answer": "Key Concepts", "explanation": concepts, "inline": True})
+
+    # History
+    render_chat(st.session_state.video_messages, scope="video")
 
 # -------------------------------
 # Session State
@@ -118,6 +253,10 @@ if "current_video_id" not in st.session_state:
     st.session_state.current_video_id = None
 if "language" not in st.session_state:
     st.session_state.language = "hinglish"
+if "tts_prefetch" not in st.session_state:
+    st.session_state.tts_prefetch = {}  # explanation text -> Future of audio bytes
+if "last_voice_clip" not in st.session_state:
+    st.session_state.last_voice_clip = None
 
 # -------------------------------
 # Sidebar
@@ -142,6 +281,7 @@ with st.sidebar:
     if st.button("🗑️ Clear History"):
         st.session_state.messages = []
         st.session_state.video_messages = []
+        st.session_state.tts_prefetch.clear()
         st.rerun()
 
 # -------------------------------
@@ -156,18 +296,23 @@ with tab1:
     st.markdown("### Ask me about Chess Stories! 🌟")
     
     # Display history
-    for msg in st.session_state.messages:
-        with st.chat_message(msg["role"]):
-            if msg["role"] == "assistant":
-                st.markdown(f"**{msg['answer']}**")
-                if msg.get("explanation"):
-                    with st.expander("Explanation"):
-                        st.markdown(msg["explanation"])
-            else:
-                st.markdown(msg["content"])
+    render_chat(st.session_state.messages)
 
     # Input
+    # Voice is recorded in the browser, so it works when the app runs on a
+    # remote server with no microphone
+    voice_clip = st.audio_input("🎙️ Or ask with your voice", key="story_voice")
     user_input = st.chat_input("Ask about the King, Queen, or Stories...", key="story_input")
+    if voice_clip is not None and not user_input:
+        # The widget keeps its value across reruns - only transcribe a new clip
+        clip_bytes = voice_clip.getvalue()
+        clip_hash = hashlib.sha1(clip_bytes).hexdigest()
+        if clip_hash != st.session_state.last_voice_clip:
+            st.session_state.last_voice_clip = clip_hash
+            with st.spinner("Listening..."):
+                user_input = api_speech_to_text(clip_bytes)
+            if not user_input:
+                st.warning("🎙️ Couldn't understand that. Please try again!")
     if user_input:
         if not api_online:
             st.error("⚠️ API is offline. Please start the server.")
@@ -184,11 +329,15 @@ with tab1:
                     
                     answer = resp.get("answer", "Error")
                     expl = resp.get("explanation", "")
+                    tts_future = prefetch_tts(answer)
+                    if expl:
+                        # Fetch the explanation audio while the child reads the answer
+                        st.session_state.tts_prefetch[expl] = prefetch_tts(expl)
                     
+                    idx = len(st.session_state.messages)
                     st.markdown(f"**{answer}**")
                     if expl:
-                        with st.expander("Explanation"):
-                            st.markdown(expl)
+                        show_explanation(expl, idx)
                     
                     st.session_state.messages.append({
                         "role": "assistant", 
@@ -197,8 +346,7 @@ with tab1:
                     })
                     
                     # Audio
-                    audio_bytes = api_get_tts_audio(answer)
-                    autoplay_audio(audio_bytes)
+                    autoplay_audio(tts_future.result())
 
 
 # ==========================================
@@ -208,12 +356,14 @@ with tab2:
     st.markdown("### 🎥 Watch & Learn")
     
     # Video Process Section
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        video_url = st.text_input("🔗 Paste YouTube URL:", placeholder="https://youtube.com/...")
-    with col2:
-        process_btn = st.button("🚀 Process", disabled=not api_online, use_container_width=True)
-    
+    # A form batches the URL field so only the Process button triggers a rerun
+    with st.form("video_process"):
+        col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+        with col1:
+            video_url = st.text_input("🔗 Paste YouTube URL:", placeholder="https://youtube.com/...")
+        with col2:
+            process_btn = st.form_submit_button("🚀 Process", disabled=not api_online, use_container_width=True)
+
     if process_btn and video_url:
         with st.spinner("Downloading & Analyzing..."):
             result = api_process_video(video_url)
@@ -229,33 +379,7 @@ with tab2:
     if st.session_state.current_video_id:
         st.info("Ask questions or click buttons for explanations!")
         
-        # Helper Buttons for Explain API
-        c1, c2, c3 = st.columns(3)
-        if c1.button("🤔 What is this?"):
-            with st.spinner("Thinking..."):
-                res = api_video_explain(st.session_state.current_video_id, "current situation", "what", st.session_state.language)
-                st.session_state.video_messages.append({"role": "assistant", "answer": "Explanation (What)", "explanation": res.get("explanation")})
-        
-        if c2.button("🧠 Why this move?"):
-            with st.spinner("Thinking..."):
-                res = api_video_explain(st.session_state.current_video_id, "latest move", "why", st.session_state.language)
-                st.session_state.video_messages.append({"role": "assistant", "answer": "Explanation (Why)", "explanation": res.get("explanation")})
-        
-        if c3.button("📝 Key Concepts"):
-            with st.spinner("Extracting..."):
-                res = requests.get(f"{API_BASE_URL}/video/concepts/{st.session_state.current_video_id}").json()
-                concepts = "\n".join([f"- **{c['name']}**: {c.get('description','')}" for c in res.get('concepts', [])])
-                st.session_state.video_messages.append({"role": "assistant", "answer": "Key Concepts", "explanation": concepts})
-
-        # History
-        for msg in st.session_state.video_messages:
-            with st.chat_message(msg["role"]):
-                if msg["role"] == "assistant":
-                    st.markdown(f"**{msg['answer']}**")
-                    if msg.get("explanation"):
-                        st.markdown(f"_{msg['explanation']}_")
-                else:
-                    st.markdown(msg["content"])
+        video_explain_panel(st.session_state.current_video_id)
 
         # Input
         vid_input = st.chat_input("Ask about the video...", key="video_input")
@@ -268,23 +392,32 @@ with tab2:
                     st.markdown(vid_input)
                 
                 with st.chat_message("assistant"):
-                    with st.spinner("Analyzing..."):
-                        resp = api_video_chat(st.session_state.current_video_id, vid_input, st.session_state.language)
-                        
-                        ans = resp.get("answer", "Error")
-                        exp = resp.get("explanation", "")
-                        
-                        st.markdown(f"**{ans}**")
-                        st.markdown(f"_{exp}_")
-                        
-                        st.session_state.video_messages.append({
-                            "role": "assistant",
-                            "answer": ans,
-                            "explanation": exp
-                        })
-                        
-                        audio_bytes = api_get_tts_audio(ans)
-                        autoplay_audio(audio_bytes)
+                    # Show tokens as they arrive, then swap in the parsed answer
+                    resp = {}
+                    streaming = st.empty()
+                    with streaming.container():
+                        st.write_stream(api_video_chat_stream(
+                            st.session_state.current_video_id, vid_input,
+                            st.session_state.language, resp
+                        ))
+                    streaming.empty()
+
+                    ans = resp.get("answer", "Error")
+                    exp = resp.get("explanation", "")
+                    tts_future = prefetch_tts(ans)
+
+                    idx = len(st.session_state.video_messages)
+                    st.markdown(f"**{ans}**")
+                    if exp:
+                        show_explanation(exp, idx, scope="video")
+
+                    st.session_state.video_messages.append({
+                        "role": "assistant",
+                        "answer": ans,
+                        "explanation": exp
+                    })
+
+                    autoplay_audio(tts_future.result())
     else:
         st.markdown("Waiting for video...")
 
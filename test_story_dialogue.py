@@ -6,7 +6,7 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-from rag.generator import generate_llm_response
+from rag.generator import generate_llm_response_stream, parse_story_response
 
 print("Testing Story Dialogue-Based Explanations\n")
 print("="*60)
@@ -21,10 +21,14 @@ for query in test_queries:
     print("-" * 60)
     
     try:
-        # Get explanation mode response
-        response = generate_llm_response(query, explain=True)
+        # Print the raw reply as it arrives, then the parsed explanation
+        buf = []
+        for token in generate_llm_response_stream(query, explain=True):
+            print(token, end="")
+            buf.append(token)
+        response = parse_story_response("".join(buf))
         
-        print(f"💡 EXPLANATION (Story Dialogue Style):")
+        print(f"\n\n💡 EXPLANATION (Story Dialogue Style):")
         print(f"{response.get('explanation', 'N/A')}\n")
         
     except Exception as e:
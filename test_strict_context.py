@@ -7,34 +7,42 @@ Run this to see:
 3. Whether the answer stays within context
 """
 
-from rag.generator import generate_llm_response
+import sys
 
-def test_question(question):
+from rag.generator import generate_llm_response_batch
+
+QUESTIONS = [
+    # Test 1: Question that SHOULD be in your stories
+    "Who protects the king?",
+    # Test 2: Question that MIGHT be in your stories
+    "How does a pawn move?",
+    # Test 3: Question that's UNLIKELY to be in your stories
+    "What is the Sicilian Defense?",
+    # Test 4: Question completely outside chess stories
+    "What's the weather today?",
+]
+
+
+def test_question(question, answer):
     print("\n" + "="*80)
     print(f"❓ QUESTION: {question}")
     print("="*80)
     
-    answer = generate_llm_response(question)
-    
     print("\n💬 ANSWER:")
     print(answer)
     print("\n" + "="*80 + "\n")
 
 
 if __name__ == "__main__":
+    # Block-buffer output (no per-line flush); flushed once when the run ends
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
     print("\n🧪 Testing Strict Context-Only Responses\n")
     
-    # Test 1: Question that SHOULD be in your stories
-    test_question("Who protects the king?")
-    
-    # Test 2: Question that MIGHT be in your stories
-    test_question("How does a pawn move?")
-    
-    # Test 3: Question that's UNLIKELY to be in your stories
-    test_question("What is the Sicilian Defense?")
-    
-    # Test 4: Question completely outside chess stories
-    test_question("What's the weather today?")
+    # All questions answered in one LLM call
+    for question, answer in zip(QUESTIONS, generate_llm_response_batch(QUESTIONS)):
+        test_question(question, answer)
     
     print("\n✅ Test complete! Check if answers stayed within context.")
     print("⚠️  If any answer made up information, adjust temperature or prompt further.\n")
+    sys.stdout.flush()
@@ -0,0 +1,16 @@
+# tests/conftest.py - Shared pytest fixtures
+import sys
+import os
+
+import pytest
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def groq_connection():
+    """Open the shared Groq connection once, before any timed LLM test."""
+    if os.getenv("GROQ_API_KEY"):
+        from services.groq_client import warm_groq_client
+        warm_groq_client()
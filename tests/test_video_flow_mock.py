@@ -3,19 +3,25 @@
 import asyncio
 import sys
 import os
+import textwrap
+from contextlib import nullcontext
+
+try:
+    import pytest
+    import pytest_asyncio
+except ImportError:  # plain `python tests/test_video_flow_mock.py` needs no test deps
+    pytest = pytest_asyncio = None
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from services import video_processor
-from rag import video_generator
-from services import video_explainer
 from api.routes import video_api
 from unittest.mock import MagicMock, patch
 
 
-# Chess-related dummy transcript
-DUMMY_TRANSCRIPT = """
+# Chess-related dummy transcript (cleaned once at import, like a real transcript)
+DUMMY_TRANSCRIPT = textwrap.dedent("""
 In this position, white plays e4, controlling the center. Black responds with e5. 
 Then white brings the knight to f3, attacking the pawn. Black defends with knight c6.
 This is the standard open game. White now moves the bishop to b5, the Ruy Lopez.
@@ -24,72 +30,97 @@ Center control is very important in chess. When you control the center,
 your pieces have more squares to move to.
 The knight on f3 is well-placed because it attacks the center.
 Always develop your pieces early in the game.
-"""
+""").strip()
 
 
-async def test_process_endpoint():
-    """Test the video process endpoint with mocked processor."""
-    print("\n🔹 Testing /video/process endpoint")
-    
-    # Mock the process_video function
+HAS_API = bool(os.getenv("GROQ_API_KEY"))
+DUMMY_VIDEO_ID = "test_video_123"
+
+
+def _mock_video_response(transcript, question, language="hinglish"):
+    """Stand-in for generate_video_response that echoes the requested language."""
+    return {
+        "answer": f"Mock answer in {language}",
+        "explanation": f"Mock explanation in {language}",
+        "language": language
+    }
+
+
+def _mock_explanation(transcript, topic, mode="full", language="hinglish"):
+    """Stand-in for explain_video_concept that echoes the requested mode."""
+    return {
+        "explanation": f"Mock {mode} explanation",
+        "key_points": ["Point 1", "Point 2"],
+        "language": language,
+        "mode": mode,
+        "status": "success"
+    }
+
+
+def _mock_or_live(name, **kwargs):
+    """Patch video_api.<name> when there's no API key, otherwise call the real thing."""
+    if HAS_API:
+        return nullcontext()
+    return patch.object(video_api, name, **kwargs)
+
+
+async def _process_dummy_video():
+    """Run /video/process for the dummy video with the processor mocked out."""
     with patch.object(video_api, 'process_video') as mock_process:
         mock_process.return_value = {
             "status": "success",
-            "video_id": "test_video_123",
+            "video_id": DUMMY_VIDEO_ID,
             "transcript": DUMMY_TRANSCRIPT,
             "title": "Chess Opening Tutorial",
             "cached": False
         }
         
         req = video_api.VideoProcessRequest(url="http://dummy.url/video")
-        response = await video_api.process_video_endpoint(req)
-        
-        assert response.status == "success"
-        assert response.video_id == "test_video_123"
-        print(f"   ✅ Process endpoint: {response.message}")
-        
-        return response.video_id
+        return await video_api.process_video_endpoint(req)
+
+
+if pytest_asyncio is not None:
+    # Tests and the shared fixture below all run on one module-scoped loop
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+    @pytest_asyncio.fixture(scope="module", loop_scope="module")
+    async def video_id():
+        """Process the dummy video once and share its id across the module."""
+        response = await _process_dummy_video()
+        yield response.video_id
+        video_api.VIDEO_STORE.pop(response.video_id, None)
+
+
+async def test_process_endpoint():
+    """Test the video process endpoint with mocked processor."""
+    print("\n🔹 Testing /video/process endpoint")
+    
+    response = await _process_dummy_video()
+    
+    assert response.status == "success"
+    assert response.video_id == DUMMY_VIDEO_ID
+    print(f"   ✅ Process endpoint: {response.message}")
 
 
 async def test_chat_endpoint(video_id: str):
     """Test the video chat endpoint."""
     print("\n🔹 Testing /video/chat endpoint")
     
-    # Ensure video is in store
-    video_api.VIDEO_STORE[video_id] = {
-        "transcript": DUMMY_TRANSCRIPT,
-        "title": "Test Video"
-    }
-    
     # Test with different languages
     languages = ["en", "hi", "hinglish"]
     
-    for lang in languages:
-        if not os.getenv("GROQ_API_KEY"):
-            # Mock the generator if no API key
-            with patch.object(video_generator, 'generate_video_response') as mock_gen:
-                mock_gen.return_value = {
-                    "answer": f"Mock answer in {lang}",
-                    "explanation": f"Mock explanation in {lang}",
-                    "language": lang
-                }
-                
-                req = video_api.VideoChatRequest(
-                    video_id=video_id,
-                    question="Why did white move the bishop?",
-                    language=lang
-                )
-                response = await video_api.chat_video_endpoint(req)
-        else:
+    # One patch serves every language (mocked only if no API key)
+    with _mock_or_live('generate_video_response', side_effect=_mock_video_response):
+        for lang in languages:
             req = video_api.VideoChatRequest(
                 video_id=video_id,
                 question="Why did white move the bishop?",
                 language=lang
             )
             response = await video_api.chat_video_endpoint(req)
-        
-        assert response.language == lang
-        print(f"   ✅ Chat ({lang}): {response.answer[:50]}...")
+            
+            assert response.language == lang
+            print(f"   ✅ Chat ({lang}): {response.answer[:50]}...")
 
 
 async def test_explain_endpoint(video_id: str):
@@ -98,25 +129,8 @@ async def test_explain_endpoint(video_id: str):
     
     modes = ["what", "why", "full"]
     
-    for mode in modes:
-        if not os.getenv("GROQ_API_KEY"):
-            with patch.object(video_explainer, 'explain_video_concept') as mock_explain:
-                mock_explain.return_value = {
-                    "explanation": f"Mock {mode} explanation",
-                    "key_points": ["Point 1", "Point 2"],
-                    "language": "hinglish",
-                    "mode": mode,
-                    "status": "success"
-                }
-                
-                req = video_api.VideoExplainRequest(
-                    video_id=video_id,
-                    topic="center control",
-                    mode=mode,
-                    language="hinglish"
-                )
-                response = await video_api.explain_video_endpoint(req)
-        else:
+    with _mock_or_live('explain_video_concept', side_effect=_mock_explanation):
+        for mode in modes:
             req = video_api.VideoExplainRequest(
                 video_id=video_id,
                 topic="center control",
@@ -124,25 +138,22 @@ async def test_explain_endpoint(video_id: str):
                 language="hinglish"
             )
             response = await video_api.explain_video_endpoint(req)
-        
-        assert response.mode == mode
-        print(f"   ✅ Explain ({mode}): {response.explanation[:50]}...")
+            
+            assert response.mode == mode
+            print(f"   ✅ Explain ({mode}): {response.explanation[:50]}...")
 
 
 async def test_concepts_endpoint(video_id: str):
     """Test the concept extraction endpoint."""
     print("\n🔹 Testing /video/concepts endpoint")
     
-    if not os.getenv("GROQ_API_KEY"):
-        with patch.object(video_explainer, 'get_video_concepts') as mock_concepts:
-            mock_concepts.return_value = [
-                {"name": "Center Control", "description": "Controlling the center squares"},
-                {"name": "Piece Development", "description": "Moving pieces out early"},
-                {"name": "Ruy Lopez", "description": "A popular chess opening"}
-            ]
-            
-            response = await video_api.get_concepts_endpoint(video_id, language="en")
-    else:
+    mock_concepts = [
+        {"name": "Center Control", "description": "Controlling the center squares"},
+        {"name": "Piece Development", "description": "Moving pieces out early"},
+        {"name": "Ruy Lopez", "description": "A popular chess opening"}
+    ]
+    
+    with _mock_or_live('get_video_concepts', return_value=mock_concepts):
         response = await video_api.get_concepts_endpoint(video_id, language="en")
     
     assert response.video_id == video_id
@@ -184,15 +195,25 @@ async def run_all_tests():
     print("🚀 ChessieBot Video Flow Tests")
     print("="*60)
     
-    has_api = bool(os.getenv("GROQ_API_KEY"))
-    print(f"\n📡 GROQ_API_KEY: {'✅ Available' if has_api else '⚠️ Not set (using mocks)'}")
+    print(f"\n📡 GROQ_API_KEY: {'✅ Available' if HAS_API else '⚠️ Not set (using mocks)'}")
     
     # Run tests
-    video_id = await test_process_endpoint()
-    await test_chat_endpoint(video_id)
-    await test_explain_endpoint(video_id)
-    await test_concepts_endpoint(video_id)
-    await test_utility_endpoints(video_id)
+    await test_process_endpoint()
+    video_id = DUMMY_VIDEO_ID
+    
+    # Ensure video is in store before the concurrent tests read it
+    video_api.VIDEO_STORE[video_id] = {
+        "transcript": DUMMY_TRANSCRIPT,
+        "title": "Test Video"
+    }
+    
+    # Independent once the video is stored - overlap their LLM round-trips
+    await asyncio.gather(
+        test_chat_endpoint(video_id),
+        test_explain_endpoint(video_id),
+        test_concepts_endpoint(video_id),
+        test_utility_endpoints(video_id)
+    )
     
     # Cleanup
     if video_id in video_api.VIDEO_STORE:
@@ -204,4 +225,10 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
-    asyncio.run(run_all_tests())
+    # Block-buffer output (no per-line flush); flushed once when the run ends
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+    try:
+        asyncio.run(run_all_tests())
+    finally:
+        sys.stdout.flush()